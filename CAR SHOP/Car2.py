@@ -1,8 +1,14 @@
 import tkinter as tk
 from tkinter import messagebox, simpledialog, ttk
 import json
+import os
+import sys
 from datetime import datetime
 
+# shared crash-safe JSON writer lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from jsonstore import atomic_write_json
+
 
 # --- Your existing Car, Customer, Purchase classes (unchanged) ---
 class Car:
@@ -103,15 +109,13 @@ def load_purchases():
 
 def save_inventory():
     data = [car.to_dict() for car in inventory]
-    with open(INVENTORY_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+    atomic_write_json(INVENTORY_FILE, data, indent=2)
     messagebox.showinfo("Success", "Inventory saved successfully!")
 
 
 def save_purchases():
     data = [purchase.to_dict() for purchase in purchases]
-    with open(PURCHASES_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+    atomic_write_json(PURCHASES_FILE, data, indent=2)
     messagebox.showinfo("Success", "Purchases saved successfully!")
 
 
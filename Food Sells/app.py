@@ -1,21 +1,40 @@
 
-import json, os
+import json, os, sys
 from datetime import datetime
-from typing import Dict, Any
-from datastore import SalesDB
+from typing import Dict, Any, Optional
+from datastore import InsufficientStock, SalesDB
 from security import hash_password, verify_password, generate_password
+from sessions import Session, SessionManager
+
+# shared crash-safe JSON writer lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from jsonstore import atomic_write_json
 
 CONFIG_FILE = os.path.join(os.path.dirname(__file__), "config.json")
 MENU_FILE = os.path.join(os.path.dirname(__file__), "menu.json")
 
+ROLES = ("manager", "cashier")
+BOOTSTRAP_USER = "manager"  # first account, created from the config.json password
+DENIED = "Permission denied: please log in as a manager."
+
 class FoodSalesApp:
     def __init__(self, menu_file: str = MENU_FILE, config_file: str = CONFIG_FILE):
         self.menu_file = menu_file
         self.config_file = config_file
-        self.inventory: Dict[str, Dict[str, Any]] = self._load_json(self.menu_file, default={})
         self.order: Dict[str, int] = {}  # item -> qty
         self.db = SalesDB()
+        if not self.db.get_inventory():
+            # first run on the database: take over the existing menu.json
+            self.db.import_inventory(self._load_json(self.menu_file, default={}))
         self._ensure_config()
+        self._ensure_users()
+        cfg = self._load_json(self.config_file, default={})
+        self.sessions = SessionManager(ttl=cfg.get("session_ttl", 900))
+
+    @property
+    def inventory(self) -> Dict[str, Dict[str, Any]]:
+        """The inventory table (item -> quantity, price, description, category); cached, read-only."""
+        return self.db.get_inventory()
 
     # ---------- Data IO ----------
     def _load_json(self, filename: str, default: Any):
@@ -28,8 +47,7 @@ class FoodSalesApp:
             return default
 
     def _save_json(self, data: Any, filename: str):
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4)
+        atomic_write_json(filename, data, indent=4)
 
     # ---------- Config & Password ----------
     def _ensure_config(self):
@@ -40,9 +58,10 @@ class FoodSalesApp:
             cfg["first_run_password"] = temp_pass  # show once in GUI
             self._save_json(cfg, self.config_file)
 
-    def validate_password(self, password: str) -> bool:
-        cfg = self._load_json(self.config_file, default={})
-        return verify_password(password, cfg.get("password"))
+    def _ensure_users(self):
+        if not self.db.all_users():
+            cfg = self._load_json(self.config_file, default={})
+            self.db.add_user(BOOTSTRAP_USER, cfg["password"], "manager")
 
     def consume_first_run_password(self) -> str:
         cfg = self._load_json(self.config_file, default={})
@@ -50,41 +69,76 @@ class FoodSalesApp:
         self._save_json(cfg, self.config_file)
         return temp
 
-    def change_password(self, new_password: str):
+    # ---------- Users & Sessions ----------
+    def login(self, username: str, password: str) -> Optional[str]:
+        """Check the password (the one bcrypt verify per login) and return a session token, or None."""
+        username = username.strip().lower()
+        user = self.db.get_user(username)
+        if user is None or not verify_password(password, user["password_hash"]):
+            self.db.log_action(username or None, "login_failed")
+            return None
+        self.db.log_action(username, "login")
+        return self.sessions.issue(username, user["role"])
+
+    def logout(self, token: Optional[str]):
+        session = self.sessions.check(token)
+        self.sessions.revoke(token)
+        if session:
+            self.db.log_action(session.username, "logout")
+
+    def session(self, token: Optional[str], role: Optional[str] = None) -> Optional[Session]:
+        """The token's live session (with the given role, if one is required), else None."""
+        session = self.sessions.check(token)
+        if session is None or (role and session.role != role):
+            return None
+        return session
+
+    def change_password(self, new_password: str, token: Optional[str] = None) -> str:
+        session = self.session(token)
+        if session is None:
+            return DENIED
+        self.db.set_password(session.username, hash_password(new_password))
         cfg = self._load_json(self.config_file, default={})
-        cfg["password"] = hash_password(new_password)
-        cfg.pop("first_run_password", None)
-        self._save_json(cfg, self.config_file)
+        if cfg.pop("first_run_password", None) is not None:
+            self._save_json(cfg, self.config_file)
+        self.db.log_action(session.username, "change_password")
+        return "Password changed successfully."
+
+    def add_user(self, username: str, password: str, role: str, token: Optional[str] = None) -> str:
+        session = self.session(token, "manager")
+        if session is None:
+            return DENIED
+        username = username.strip().lower()
+        if role not in ROLES:
+            return f"Role must be one of: {', '.join(ROLES)}."
+        if not self.db.add_user(username, hash_password(password), role):
+            return f"User {username} already exists."
+        self.db.log_action(session.username, "add_user", f"{username} ({role})")
+        return f"Added {role} {username}."
 
     # ---------- Inventory ----------
-    def add_update_item(self, item: str, quantity: int, price: float, description: str = "", category: str = "Uncategorized") -> str:
+    def add_update_item(self, item: str, quantity: int, price: float, description: str = "", category: str = "Uncategorized",
+                        token: Optional[str] = None) -> str:
+        session = self.session(token, "manager")
+        if session is None:
+            return DENIED
         item = item.lower()
-        entry = self.inventory.get(item)
-        if entry:
-            entry["quantity"] = int(entry.get("quantity", 0)) + int(quantity)
-            if price > 0:
-                entry["price"] = float(price)
-            if description:
-                entry["description"] = description
-            if category:
-                entry["category"] = category
-            feedback = f"Updated {item.capitalize()} to qty={entry['quantity']}."
+        existed = item in self.inventory
+        qty = self.db.restock_item(item, int(quantity), float(price), description, category)
+        if existed:
+            feedback = f"Updated {item.capitalize()} to qty={qty}."
         else:
-            self.inventory[item] = {
-                "quantity": int(quantity),
-                "price": float(price),
-                "description": description or "No description.",
-                "category": category or "Uncategorized",
-            }
             feedback = f"Added {quantity} {item.capitalize()}."
-        self._save_json(self.inventory, self.menu_file)
+        self.db.log_action(session.username, "add_update_item", f"{item} +{quantity} @ {price:.2f}")
         return feedback
 
-    def update_item_price(self, item: str, price: float) -> str:
+    def update_item_price(self, item: str, price: float, token: Optional[str] = None) -> str:
+        session = self.session(token, "manager")
+        if session is None:
+            return DENIED
         item = item.lower()
-        if item in self.inventory and price > 0:
-            self.inventory[item]["price"] = float(price)
-            self._save_json(self.inventory, self.menu_file)
+        if price > 0 and self.db.set_price(item, float(price)):
+            self.db.log_action(session.username, "update_item_price", f"{item} -> {price:.2f}")
             return f"{item.capitalize()} price updated to ${price:.2f}"
         return f"{item.capitalize()} not found or invalid price."
 
@@ -123,7 +177,7 @@ class FoodSalesApp:
         return f"{item.capitalize()} removed."
 
     # ---------- Checkout ----------
-    def checkout(self, payment_method: str) -> tuple[bool, str]:
+    def checkout(self, payment_method: str, token: Optional[str] = None) -> tuple[bool, str]:
         if not self.order:
             return False, "Your order is empty!"
 
@@ -143,10 +197,17 @@ class FoodSalesApp:
                 "price_per_item": price,
                 "total_price": subtotal
             })
-            self.inventory[item]["quantity"] -= qty
-        self._save_json(self.inventory, self.menu_file)
 
-        order_id = self.db.add_order(items, payment_method=payment_method)
+        session = self.session(token)  # sale is attributed to the logged-in user, if any
+        username = session.username if session else None
+
+        # stock is deducted by guarded UPDATEs in the sale's transaction: another till
+        # selling the last one in the meantime fails this checkout instead of overselling
+        try:
+            order_id = self.db.add_order(items, payment_method=payment_method, username=username, deduct_stock=True)
+        except InsufficientStock as e:
+            return False, f"Checkout failed: Insufficient stock for {e.item.capitalize()}."
+        self.db.log_action(username, "checkout", f"{order_id} ${total:.2f} {payment_method}")
 
         receipt = ["--- Receipt ---"]
         for it in items:
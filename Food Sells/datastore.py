@@ -1,13 +1,143 @@
+import atexit
+import os
+import queue
 import sqlite3
+import sys
+import threading
+import time
+import uuid
 from datetime import datetime
 import csv
 
+
+def _utc_now():
+    # same format as the tables' CURRENT_TIMESTAMP defaults
+    return datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+
+
+AUDIT_TABLE = """CREATE TABLE IF NOT EXISTS {schema}.audit (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT,
+    action TEXT NOT NULL,
+    details TEXT,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)"""
+
+
+def _create_audit_indexes(cur, schema="main"):
+    # each index also orders by rowid, i.e. pages on (timestamp, id) come straight off it
+    cur.execute(f"CREATE INDEX IF NOT EXISTS {schema}.idx_audit_timestamp ON audit(timestamp)")
+    cur.execute(f"CREATE INDEX IF NOT EXISTS {schema}.idx_audit_user_timestamp ON audit(username, timestamp)")
+
+
+def _month_after(month):
+    year, mon = int(month[:4]), int(month[5:7])
+    return f"{year + mon // 12:04d}-{mon % 12 + 1:02d}"
+
+
+class AuditSink:
+    """
+    Writes audit events off the caller's thread. log() stamps the event and puts it on a
+    bounded queue; a writer thread with its own connection inserts whatever has queued up
+    in one transaction. flush() waits until everything logged so far is committed, and
+    close() (also run at interpreter exit) drains the queue before the thread stops.
+    """
+
+    _STOP = object()
+
+    def __init__(self, db_path, maxsize=10000, batch_max=500):
+        self.db_path = db_path
+        self.batch_max = batch_max
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def log(self, username, action, details=""):
+        if self._closed:
+            raise RuntimeError("audit sink is closed")
+        # blocks only if the writer is maxsize events behind
+        self._queue.put((username, action, details, _utc_now()))
+
+    def flush(self):
+        if not self._closed:
+            self._queue.join()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(self._STOP)
+        self._thread.join()
+
+    def _run(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA busy_timeout=5000")
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_max:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            rows = [e for e in batch if e is not self._STOP]
+            stop = len(rows) != len(batch)
+            try:
+                if rows:
+                    self._write(conn, rows)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        # events that raced close() past the stop marker
+        rest = []
+        while True:
+            try:
+                rest.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if rest:
+            self._write(conn, rest)
+        conn.close()
+
+    def _write(self, conn, rows):
+        """Insert rows, retrying while the database is locked; on failure the batch is dropped
+        and reported, never raised, so the writer thread outlives a bad batch."""
+        for attempt in range(5):
+            try:
+                with conn:
+                    conn.executemany("INSERT INTO audit (username, action, details, timestamp) VALUES (?, ?, ?, ?)", rows)
+                return
+            except sqlite3.OperationalError as e:  # e.g. database locked past busy_timeout
+                error = e
+                time.sleep(0.1 * (attempt + 1))
+            except Exception as e:  # e.g. a value sqlite3 cannot bind; retrying won't help
+                error = e
+                break
+        print(f"audit: dropped {len(rows)} events: {error}", file=sys.stderr)
+
+
+class InsufficientStock(Exception):
+    """An order asked for more of an item than the inventory table holds (nothing was written)."""
+
+    def __init__(self, item):
+        super().__init__(f"Insufficient stock for {item}")
+        self.item = item
+
+
 class SalesDB:
     def __init__(self, db_path="sales.db"):
         self.db_path = db_path
         self._conn = sqlite3.connect(self.db_path)
         self._conn.row_factory = sqlite3.Row
+        # get_inventory cache: (PRAGMA data_version, inventory_meta.version) it was read at
+        self._inventory = None
+        self._inventory_seen = (None, None)
+        # WAL: the audit writer's connection and this one don't block each other's readers
+        self._conn.execute("PRAGMA journal_mode=WAL")
         self._init_db()
+        self.audit = AuditSink(self.db_path)
 
     def _init_db(self):
         cur = self._conn.cursor()
@@ -20,8 +150,21 @@ class SalesDB:
         cur.execute("""CREATE TABLE IF NOT EXISTS inventory (
             item TEXT PRIMARY KEY,
             quantity INTEGER NOT NULL,
-            price REAL NOT NULL
+            price REAL NOT NULL,
+            description TEXT,
+            category TEXT
         )""")
+        columns = {r["name"] for r in cur.execute("PRAGMA table_info(inventory)")}
+        for column in ("description", "category"):
+            if column not in columns:
+                cur.execute(f"ALTER TABLE inventory ADD COLUMN {column} TEXT")
+        # every inventory write bumps one counter, so readers can tell inventory changes
+        # apart from the sales/audit commits that also move PRAGMA data_version
+        cur.execute("CREATE TABLE IF NOT EXISTS inventory_meta (id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL)")
+        cur.execute("INSERT OR IGNORE INTO inventory_meta (id, version) VALUES (1, 0)")
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            cur.execute(f"CREATE TRIGGER IF NOT EXISTS inventory_{event.lower()}_version AFTER {event} ON inventory "
+                        "BEGIN UPDATE inventory_meta SET version = version + 1 WHERE id = 1; END")
         cur.execute("""CREATE TABLE IF NOT EXISTS sales (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             order_id TEXT NOT NULL,
@@ -39,6 +182,7 @@ class SalesDB:
             details TEXT,
             timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )""")
+        _create_audit_indexes(cur)
         self._conn.commit()
 
     def add_user(self, username, password_hash, role):
@@ -53,19 +197,102 @@ class SalesDB:
         cur = self._conn.execute("SELECT * FROM users WHERE username=?", (username,))
         return cur.fetchone()
 
+    def set_password(self, username, password_hash):
+        cur = self._conn.execute("UPDATE users SET password_hash=? WHERE username=?", (password_hash, username))
+        self._conn.commit()
+        return cur.rowcount == 1
+
     def all_users(self):
         cur = self._conn.execute("SELECT username, role, created_at FROM users")
         return cur.fetchall()
 
-    def add_update_item(self, item, qty, price):
-        self._conn.execute("INSERT INTO inventory (item, quantity, price) VALUES (?, ?, ?) "
-                           "ON CONFLICT(item) DO UPDATE SET quantity=?, price=?",
-                           (item, qty, price, qty, price))
+    def add_update_item(self, item, qty, price, description=None, category=None):
+        """Set item's quantity and price (description/category kept unless given)."""
+        self._conn.execute("INSERT INTO inventory (item, quantity, price, description, category) VALUES (?, ?, ?, ?, ?) "
+                           "ON CONFLICT(item) DO UPDATE SET quantity=excluded.quantity, price=excluded.price, "
+                           "description=COALESCE(excluded.description, description), category=COALESCE(excluded.category, category)",
+                           (item, qty, price, description, category))
+        self._conn.commit()
+        self._inventory_seen = (None, None)
+
+    def restock_item(self, item, added, price=0.0, description="", category=""):
+        """
+        Add `added` to item's stock in one statement (other tills' sales are kept); price,
+        description and category change only when given. Returns the new quantity.
+        """
+        row = self._conn.execute(
+            "INSERT INTO inventory (item, quantity, price, description, category) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(item) DO UPDATE SET quantity=quantity+excluded.quantity, "
+            "price=CASE WHEN excluded.price > 0 THEN excluded.price ELSE price END, "
+            "description=COALESCE(NULLIF(?, ''), description), category=COALESCE(NULLIF(?, ''), category) "
+            "RETURNING quantity",
+            (item, added, price, description or "No description.", category or "Uncategorized", description, category),
+        ).fetchone()
+        self._conn.commit()
+        self._inventory_seen = (None, None)
+        return row["quantity"]
+
+    def set_price(self, item, price):
+        cur = self._conn.execute("UPDATE inventory SET price=? WHERE item=?", (price, item))
         self._conn.commit()
+        self._inventory_seen = (None, None)
+        return cur.rowcount == 1
+
+    def import_inventory(self, inventory):
+        """Load a menu.json-shaped dict (item -> {quantity, price, description, category})."""
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO inventory (item, quantity, price, description, category) VALUES (?, ?, ?, ?, ?)",
+                [(item.lower(), int(d.get("quantity", 0)), float(d.get("price", 0)),
+                  d.get("description") or "No description.", d.get("category") or "Uncategorized")
+                 for item, d in inventory.items()])
+        self._inventory_seen = (None, None)
 
     def get_inventory(self):
-        cur = self._conn.execute("SELECT * FROM inventory")
-        return {row["item"]: {"quantity": row["quantity"], "price": row["price"]} for row in cur.fetchall()}
+        """
+        item -> {quantity, price, description, category}, cached. PRAGMA data_version tells
+        whether any other connection committed since the last read; only then is the
+        inventory_meta counter read, and only if that moved is the table scanned again.
+        The returned dict is shared: treat it as read-only.
+        """
+        data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if self._inventory is not None and data_version == self._inventory_seen[0]:
+            return self._inventory
+        version = self._conn.execute("SELECT version FROM inventory_meta WHERE id = 1").fetchone()[0]
+        if self._inventory is None or version != self._inventory_seen[1]:
+            cur = self._conn.execute("SELECT * FROM inventory")
+            self._inventory = {
+                row["item"]: {"quantity": row["quantity"], "price": row["price"],
+                              "description": row["description"] or "No description.",
+                              "category": row["category"] or "Uncategorized"}
+                for row in cur.fetchall()
+            }
+        self._inventory_seen = (data_version, version)
+        return self._inventory
+
+    def add_order(self, items, payment_method="cash", username=None, deduct_stock=False):
+        """
+        All lines of one order in a single transaction; returns the new order id. With
+        deduct_stock=True each line also runs UPDATE ... WHERE quantity >= ? in that
+        transaction, and InsufficientStock is raised (nothing written) if one can't be covered,
+        so concurrent tills can't oversell.
+        """
+        order_id = uuid.uuid4().hex[:12]
+        ts = _utc_now()
+        with self._conn:
+            if deduct_stock:
+                self._conn.execute("BEGIN IMMEDIATE")
+                for it in items:
+                    cur = self._conn.execute("UPDATE inventory SET quantity = quantity - ? WHERE item = ? AND quantity >= ?",
+                                             (it["quantity"], it["item"], it["quantity"]))
+                    if cur.rowcount != 1:
+                        raise InsufficientStock(it["item"])
+            self._conn.executemany(
+                "INSERT INTO sales (order_id, username, item, quantity, total_price, payment_method, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(order_id, username, it["item"], it["quantity"], it["total_price"], payment_method, ts) for it in items])
+        if deduct_stock:
+            self._inventory_seen = (None, None)
+        return order_id
 
     def record_sale(self, order_id, username, item, qty, total_price, payment):
         self._conn.execute("INSERT INTO sales (order_id, username, item, quantity, total_price, payment_method) VALUES (?, ?, ?, ?, ?, ?)",
@@ -89,9 +316,98 @@ class SalesDB:
                 writer.writerow(r)
 
     def log_action(self, username, action, details=""):
-        self._conn.execute("INSERT INTO audit (username, action, details) VALUES (?, ?, ?)", (username, action, details))
-        self._conn.commit()
+        # queued; written in batches by the audit thread
+        self.audit.log(username, action, details)
 
     def audit_log(self, limit=100):
-        cur = self._conn.execute("SELECT * FROM audit ORDER BY timestamp DESC LIMIT ?", (limit,))
-        return cur.fetchall()
+        return self.query_audit(limit=limit, archived=False)
+
+    # ---------- Audit queries and archives ----------
+    # Old months can be moved out of sales.db into one file per month under audit_archive/
+    # (audit-YYYY-MM.db, same table and indexes). query_audit reads the archives whose month
+    # overlaps the requested range by ATTACHing them, so moving a month out is cheap and
+    # invisible to callers, and an archive file can be copied away or deleted on its own.
+    @property
+    def archive_dir(self):
+        return os.path.join(os.path.dirname(os.path.abspath(self.db_path)), "audit_archive")
+
+    def _archive_path(self, month):
+        return os.path.join(self.archive_dir, f"audit-{month}.db")
+
+    def archived_months(self):
+        if not os.path.isdir(self.archive_dir):
+            return []
+        return sorted(f[6:13] for f in os.listdir(self.archive_dir) if f.startswith("audit-") and f.endswith(".db"))
+
+    def query_audit(self, username=None, action=None, start=None, end=None, before=None, limit=100, archived=True):
+        """
+        Audit events newest first, optionally filtered by user, action and start <= timestamp < end
+        (timestamps compare as "YYYY-MM-DD HH:MM:SS" strings, so "2024-03" or "2024-03-05" work).
+        Keyset pagination: pass the last row's (timestamp, id) as before to get the next page.
+        With archived=True the matching monthly archive files are searched too.
+        """
+        self.audit.flush()
+        where, params = [], []
+        if username is not None:
+            where.append("username = ?")
+            params.append(username)
+        if action is not None:
+            where.append("action = ?")
+            params.append(action)
+        if start:
+            where.append("timestamp >= ?")
+            params.append(start)
+        if end:
+            where.append("timestamp < ?")
+            params.append(end)
+        if before is not None:
+            where.append("(timestamp, id) < (?, ?)")
+            params += list(before)
+        sql = "SELECT * FROM {schema}.audit"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+        params.append(limit)
+
+        rows = self._conn.execute(sql.format(schema="main"), params).fetchall()
+        if archived:
+            for month in self.archived_months():
+                if (start and _month_after(month) <= start[:7]) or (end and month > end[:7]) \
+                        or (before is not None and month > before[0][:7]):
+                    continue
+                self._conn.execute("ATTACH DATABASE ? AS arch", (self._archive_path(month),))
+                try:
+                    rows += self._conn.execute(sql.format(schema="arch"), params).fetchall()
+                finally:
+                    self._conn.execute("DETACH DATABASE arch")
+            rows.sort(key=lambda r: (r["timestamp"], r["id"]), reverse=True)
+        return rows[:limit]
+
+    def archive_audit(self, before_month):
+        """
+        Move every month of audit events older than before_month ("YYYY-MM") into its own
+        archive file; returns the months moved. Rows are copied with INSERT OR IGNORE before
+        they are deleted, so re-running after an interruption never loses or duplicates events.
+        """
+        self.audit.flush()
+        months = [r[0] for r in self._conn.execute(
+            "SELECT DISTINCT substr(timestamp, 1, 7) FROM audit WHERE timestamp < ?", (before_month,))]
+        os.makedirs(self.archive_dir, exist_ok=True)
+        for month in months:
+            self._conn.execute("ATTACH DATABASE ? AS arch", (self._archive_path(month),))
+            try:
+                cur = self._conn.cursor()
+                cur.execute(AUDIT_TABLE.format(schema="arch"))
+                _create_audit_indexes(cur, "arch")
+                bounds = (f"{month}-01", f"{_month_after(month)}-01")
+                with self._conn:
+                    cur.execute("INSERT OR IGNORE INTO arch.audit SELECT * FROM main.audit "
+                                "WHERE timestamp >= ? AND timestamp < ?", bounds)
+                    cur.execute("DELETE FROM main.audit WHERE timestamp >= ? AND timestamp < ?", bounds)
+            finally:
+                self._conn.execute("DETACH DATABASE arch")
+        return months
+
+    def close(self):
+        self.audit.close()
+        self._conn.close()
@@ -5,7 +5,7 @@ from datetime import datetime
 from typing import Any, Dict
 import json, os
 
-from app import FoodSalesApp
+from app import FoodSalesApp, ROLES
 from datastore import SalesDB
 
 DARK = {
@@ -39,6 +39,9 @@ class FoodSalesGUI:
 
         self.app = FoodSalesApp()
         self.db = self.app.db
+        # separate sessions: manager actions present manager_token, sales are attributed to cashier_token
+        self.manager_token = None
+        self.cashier_token = None
 
         self._style = ttk.Style()
         self._style.configure("Treeview.Heading", font=('Arial', 12, 'bold'))
@@ -114,16 +117,36 @@ class FoodSalesGUI:
         mkbtn("Exit", self.master.quit, bg=self.theme["danger"]).grid(row=1, column=1, padx=10, pady=10)
 
     # Manager flow
-    def _manager_login(self) -> bool:
-        pw = simpledialog.askstring("Manager Login", "Enter Manager Password:", show="*")
-        return (pw is not None) and self.app.validate_password(pw)
+    def _login(self, title: str, roles=ROLES):
+        """Ask for credentials; a token for a session with one of roles, else None (nothing kept)."""
+        user = simpledialog.askstring(title, "Username:", initialvalue="manager" if roles == ("manager",) else "")
+        if not user:
+            return None
+        pw = simpledialog.askstring(title, "Password:", show="*")
+        if pw is None:
+            return None
+        # bcrypt runs once here; actions then present the token
+        token = self.app.login(user, pw)
+        session = self.app.session(token)
+        if session is None or session.role not in roles:
+            self.app.logout(token)  # right password, wrong role: don't leave the session open
+            return None
+        return token
 
     def _manager_menu(self):
-        if not self._manager_login():
-            messagebox.showerror("Denied", "Incorrect password.")
-            return
+        if self.app.session(self.manager_token, "manager") is None:
+            token = self._login("Manager Login", ("manager",))
+            if token is None:
+                messagebox.showerror("Denied", "Incorrect username/password, or not a manager.")
+                return
+            self.manager_token = token
         self._manager_menu_gui()
 
+    def _logout(self):
+        self.app.logout(self.manager_token)
+        self.manager_token = None
+        self._build_main_menu()
+
     def _manager_menu_gui(self):
         self._clear()
         frame = tk.Frame(self.master, bg=self.theme["bg_frame"], bd=6, relief="groove")
@@ -142,7 +165,8 @@ class FoodSalesGUI:
         mk("Review Sales (DB)", self._view_sales)
         mk("Export Sales to CSV", self._export_sales)
         mk("Change Password", self._change_password)
-        mk("Back to Main Menu", self._build_main_menu)
+        mk("Add User", self._add_user)
+        mk("Log Out", self._logout)
 
     def _view_inventory(self):
         self._clear()
@@ -194,7 +218,7 @@ class FoodSalesGUI:
             desc = vars[4].get().strip()
             if not name or qty <= 0 or price <= 0:
                 messagebox.showerror("Invalid", "Provide name, positive quantity and price.", parent=win); return
-            msg = self.app.add_update_item(name, qty, price, desc, cat)
+            msg = self.app.add_update_item(name, qty, price, desc, cat, token=self.manager_token)
             messagebox.showinfo("OK", msg, parent=win); win.destroy()
         tk.Button(win, text="Submit", command=submit, bg=self.theme["success"], fg="white").grid(row=len(fields), column=0, columnspan=2, pady=10)
 
@@ -214,7 +238,7 @@ class FoodSalesGUI:
                 price = float(price_var.get())
             except:
                 messagebox.showerror("Invalid", "Enter a number for price.", parent=win); return
-            res = self.app.update_item_price(item_var.get(), price)
+            res = self.app.update_item_price(item_var.get(), price, token=self.manager_token)
             messagebox.showinfo("Result", res, parent=win); win.destroy()
         tk.Button(win, text="Submit", command=submit, bg=self.theme["success"], fg="white").grid(row=2, column=0, columnspan=2, pady=10)
 
@@ -249,11 +273,28 @@ class FoodSalesGUI:
         messagebox.showinfo("Exported", f"Saved to:\n{out}")
 
     def _change_password(self):
-        new = simpledialog.askstring("Change Password", "Enter new manager password:", show="*")
+        new = simpledialog.askstring("Change Password", "Enter your new password:", show="*")
         if not new or len(new) < 8:
             messagebox.showerror("Invalid", "Password must be at least 8 characters."); return
-        self.app.change_password(new)
-        messagebox.showinfo("Done", "Password changed successfully.")
+        messagebox.showinfo("Done", self.app.change_password(new, token=self.manager_token))
+
+    def _add_user(self):
+        win = tk.Toplevel(self.master); win.title("Add User"); win.configure(bg=self.theme["bg_frame"])
+        tk.Label(win, text="Username:", bg=self.theme["bg_frame"], fg=self.theme["fg"]).grid(row=0, column=0, padx=6, pady=6, sticky="e")
+        user_var = tk.StringVar()
+        tk.Entry(win, textvariable=user_var).grid(row=0, column=1, padx=6, pady=6)
+        tk.Label(win, text="Password:", bg=self.theme["bg_frame"], fg=self.theme["fg"]).grid(row=1, column=0, padx=6, pady=6, sticky="e")
+        pw_var = tk.StringVar()
+        tk.Entry(win, textvariable=pw_var, show="*").grid(row=1, column=1, padx=6, pady=6)
+        tk.Label(win, text="Role:", bg=self.theme["bg_frame"], fg=self.theme["fg"]).grid(row=2, column=0, padx=6, pady=6, sticky="e")
+        role_var = tk.StringVar(value="cashier")
+        ttk.Combobox(win, textvariable=role_var, values=["cashier", "manager"], state="readonly").grid(row=2, column=1, padx=6, pady=6)
+        def submit():
+            if not user_var.get().strip() or len(pw_var.get()) < 8:
+                messagebox.showerror("Invalid", "Provide a username and a password of at least 8 characters.", parent=win); return
+            res = self.app.add_user(user_var.get(), pw_var.get(), role_var.get(), token=self.manager_token)
+            messagebox.showinfo("Result", res, parent=win); win.destroy()
+        tk.Button(win, text="Submit", command=submit, bg=self.theme["success"], fg="white").grid(row=3, column=0, columnspan=2, pady=10)
 
     # Customer flow
     def _customer_menu(self):
@@ -265,8 +306,28 @@ class FoodSalesGUI:
         tk.Label(frame, text="Welcome, Customer!", font=("Arial", 20, "bold"), bg=self.theme["bg_frame"], fg=self.theme["fg"]).pack(pady=10)
 
         tk.Button(frame, text="▶ Start New Order", command=self._ordering, font=("Arial", 16, "bold"), bg=self.theme["success"], fg="white", width=24, height=2, bd=0).pack(pady=12)
+        cashier = self.app.session(self.cashier_token)
+        if cashier:
+            tk.Label(frame, text=f"Cashier: {cashier.username}", bg=self.theme["bg_frame"], fg=self.theme["fg"]).pack(pady=4)
+            tk.Button(frame, text="Cashier Log Out", command=self._cashier_logout, bg=self.theme["accent"], fg="white").pack(pady=6)
+        else:
+            tk.Button(frame, text="Cashier Login", command=self._cashier_login, bg=self.theme["accent"], fg="white").pack(pady=6)
         tk.Button(frame, text="Back to Main Menu", command=self._build_main_menu, bg=self.theme["danger"], fg="white").pack(pady=6)
 
+    def _cashier_login(self):
+        token = self._login("Cashier Login")
+        if token is None:
+            messagebox.showerror("Denied", "Incorrect username/password.")
+            return
+        self.app.logout(self.cashier_token)
+        self.cashier_token = token
+        self._customer_menu()
+
+    def _cashier_logout(self):
+        self.app.logout(self.cashier_token)
+        self.cashier_token = None
+        self._customer_menu()
+
     def _ordering(self):
         self._clear()
         main = tk.Frame(self.master, bg=self.theme["bg_main"])
@@ -396,7 +457,7 @@ class FoodSalesGUI:
         var = tk.StringVar(value="cash")
         ttk.Combobox(frame, textvariable=var, values=["cash","card","online"], state="readonly").pack(pady=6)
         def complete():
-            ok, msg = self.app.checkout(var.get())
+            ok, msg = self.app.checkout(var.get(), token=self.cashier_token)
             if ok:
                 messagebox.showinfo("Success", msg)
                 self._customer_menu()
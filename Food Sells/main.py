@@ -6,3 +6,4 @@ if __name__ == "__main__":
     root = tk.Tk()
     app = FoodSalesGUI(root)
     root.mainloop()
+    app.db.close()  # commits any queued audit events
@@ -0,0 +1,87 @@
+"""
+Login sessions for FoodSalesApp.
+
+bcrypt is checked once, at login. After that, every manager action presents a session token
+instead of the password:
+
+    token = sessions.issue("alice", "manager")
+    session = sessions.check(token)     # Session(username, role, expires) or None
+
+A token is "<session id>.<expiry>.<signature>", where the signature is an HMAC-SHA256 over
+the id and expiry. It is keyed with a secret that lives only in this process.
+check() recomputes the signature and compares it with hmac.compare_digest. It then looks
+the id up in the in-memory session table, so a token can be revoked (logout) before it
+expires. Each check is a hash and a dict lookup, not a bcrypt round.
+"""
+import base64
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from typing import Dict, NamedTuple, Optional
+
+
+class Session(NamedTuple):
+    username: str
+    role: str
+    expires: float
+
+
+class SessionManager:
+    def __init__(self, ttl: float = 900.0, secret: Optional[bytes] = None):
+        self.ttl = ttl
+        self._secret = secret or secrets.token_bytes(32)
+        self._sessions: Dict[str, Session] = {}
+        self._lock = threading.Lock()
+
+    def _sign(self, payload: str) -> str:
+        digest = hmac.new(self._secret, payload.encode("ascii"), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def _parse(token) -> Optional[tuple]:
+        """(sid, expires, signature) of a well-formed token; None for anything else."""
+        if not isinstance(token, str) or not token.isascii():
+            return None
+        try:
+            sid, expires, signature = token.split(".")
+            return sid, int(expires), signature
+        except ValueError:
+            return None
+
+    def issue(self, username: str, role: str) -> str:
+        sid = secrets.token_urlsafe(16)
+        expires = int(time.time() + self.ttl)
+        with self._lock:
+            self._sessions[sid] = Session(username, role, expires)
+            self._purge()
+        payload = f"{sid}.{expires}"
+        return f"{payload}.{self._sign(payload)}"
+
+    def check(self, token: Optional[str]) -> Optional[Session]:
+        """The token's session if it is authentic, unexpired and not revoked; else None."""
+        parts = self._parse(token)
+        if parts is None:
+            return None
+        sid, expires, signature = parts
+        if not hmac.compare_digest(signature.encode("ascii"), self._sign(f"{sid}.{expires}").encode("ascii")):
+            return None
+        if expires < time.time():
+            self.revoke(token)
+            return None
+        with self._lock:
+            return self._sessions.get(sid)
+
+    def revoke(self, token: Optional[str]):
+        parts = self._parse(token)
+        if parts is None:
+            return
+        sid = parts[0]
+        with self._lock:
+            self._sessions.pop(sid, None)
+
+    def _purge(self):
+        now = time.time()
+        for sid in [s for s, v in self._sessions.items() if v.expires < now]:
+            del self._sessions[sid]
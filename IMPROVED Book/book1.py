@@ -1,3 +1,5 @@
+import os
+import sys
 import uuid
 import json
 from dataclasses import dataclass, asdict, field
@@ -5,6 +7,10 @@ from datetime import datetime, timedelta
 import tkinter as tk
 from tkinter import messagebox, simpledialog
 
+# shared crash-safe JSON writer lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from jsonstore import atomic_write_json
+
 
 # ---------------- Load Config ----------------
 def load_config(config_file="config.json"):
@@ -56,8 +62,7 @@ class OnlineBookstore:
 
     def save_shelf(self):
         data = [book.to_dict() for book in self.books.values()]
-        with open(self.shelf_file, "w") as f:
-            json.dump(data, f, indent=4)
+        atomic_write_json(self.shelf_file, data, indent=4)
 
     def load_borrowed(self):
         try:
@@ -68,8 +73,7 @@ class OnlineBookstore:
             self.save_borrowed()
 
     def save_borrowed(self):
-        with open(self.borrow_file, "w") as f:
-            json.dump(self.borrowed, f, indent=4)
+        atomic_write_json(self.borrow_file, self.borrowed, indent=4)
 
     # ---------------- Utility ----------------
     def find_book(self, identifier):
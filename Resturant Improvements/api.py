@@ -0,0 +1,322 @@
+"""
+HTTP/JSON API around FoodSalesApp, so web kiosks and tablets share the tills' engine.
+
+    python api.py [--host 127.0.0.1] [--port 8080] [--workers 4] [--queue 64]
+
+Endpoints (JSON in and out; <session> is any id the client picks, or one from POST /sessions):
+
+    GET    /menu                          whole menu, with an ETag (If-None-Match -> 304)
+    GET    /menu?q=piz                    names of in-stock items matching a search
+    POST   /sessions                      open a cart -> {"session": id}
+    GET    /cart/<session>                lines and total
+    POST   /cart/<session>/items          {"item": "pizza", "quantity": 2}
+    PATCH  /cart/<session>/items/<item>   {"change": -1}
+    DELETE /cart/<session>/items/<item>
+    DELETE /cart/<session>                drop the cart
+    POST   /cart/<session>/checkout       {"payment_method": "card"} -> receipt
+    GET    /reports/summary?period=daily  daily | weekly | monthly | all
+    GET    /reports/sales?limit=100&after=<id>&q=   newest first; "next" is the after= for the next page
+
+The server is a small HTTP/1.1 implementation on asyncio streams: connections are kept
+alive until the client closes them or idles for --keep-alive seconds, and pipelined requests
+are answered in order. Anything that takes the app lock or touches SQLite runs on a bounded
+thread pool; once --queue requests are waiting for it, new ones get 503 + Retry-After rather
+than queueing without limit. The menu body and its ETag are built once per inventory change
+(FoodSalesApp.inventory_version), so a kiosk polling /menu costs a version check and, with
+If-None-Match, an empty 304. Carts idle for --session-idle seconds are dropped.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import secrets
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from app import FoodSalesApp
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str = "", headers: Optional[Dict[str, str]] = None):
+        super().__init__(message or HTTPStatus(status).phrase)
+        self.status = status
+        self.headers = headers or {}
+
+
+class Request:
+    def __init__(self, method: str, target: str, version: str, headers: Dict[str, str], body: bytes):
+        self.method = method
+        self.version = version
+        self.headers = headers
+        self.body = body
+        url = urlsplit(target)
+        self.parts = [unquote(p) for p in url.path.split("/") if p]
+        self.query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+    @property
+    def keep_alive(self) -> bool:
+        conn = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return conn == "keep-alive"
+        return conn != "close"
+
+    def json(self) -> Dict[str, Any]:
+        if not self.body:
+            return {}
+        try:
+            data = json.loads(self.body)
+        except ValueError:
+            raise HTTPError(400, "Body is not valid JSON.")
+        if not isinstance(data, dict):
+            raise HTTPError(400, "Body must be a JSON object.")
+        return data
+
+
+class POSServer:
+    def __init__(self, app: FoodSalesApp, workers: int = 4, queue: int = 64,
+                 keep_alive: float = 15.0, session_idle: float = 1800.0, cors: str = "*"):
+        self.app = app
+        self.keep_alive = keep_alive
+        self.session_idle = session_idle
+        self.cors = cors
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pos-api")
+        self._slots = asyncio.Semaphore(workers + queue)
+        self._menu: Optional[Tuple[int, bytes, str]] = None  # (inventory_version, body, etag)
+
+    # ---------- plumbing ----------
+    async def run_app(self, fn, *args, **kwargs):
+        """Run fn on the worker pool, or 503 if too many requests are already waiting for it."""
+        if self._slots.locked():
+            raise HTTPError(503, "Server busy, try again.", {"Retry-After": "1"})
+        async with self._slots:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, lambda: fn(*args, **kwargs))
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), self.keep_alive)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except HTTPError as e:
+                    await self._send(writer, e.status, {"error": str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                try:
+                    status, payload, headers = await self.dispatch(request)
+                except HTTPError as e:
+                    status, payload, headers = e.status, {"error": str(e)}, e.headers
+                except Exception as e:  # details go to the log, not to the client
+                    print(f"{request.method} {'/'.join(request.parts)} failed: {e!r}", file=sys.stderr)
+                    status, payload, headers = 500, {"error": "Internal server error."}, {}
+                await self._send(writer, status, payload, headers, request.keep_alive)
+                if not request.keep_alive:
+                    break
+        except ConnectionError:
+            pass  # client went away mid-response
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Request]:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as e:
+            if not e.partial.strip():
+                return None  # client closed between requests
+            raise
+        except asyncio.LimitOverrunError:
+            raise HTTPError(431)
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line.")
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise HTTPError(411, "Send a Content-Length body.")
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HTTPError(400, "Bad Content-Length.")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413)
+        body = await reader.readexactly(length) if length else b""
+        return Request(method.upper(), target, version, headers, body)
+
+    async def _send(self, writer: asyncio.StreamWriter, status: int, payload, headers: Dict[str, str] = None,
+                    keep_alive: bool = True):
+        if isinstance(payload, bytes):
+            body = payload
+        elif payload is None:
+            body = b""
+        else:
+            body = json.dumps(payload).encode("utf-8")
+        lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+        out = {"Content-Length": str(len(body)), "Access-Control-Allow-Origin": self.cors}
+        if body:
+            out["Content-Type"] = "application/json; charset=utf-8"
+        out["Connection"] = "keep-alive" if keep_alive else "close"
+        if keep_alive:
+            out["Keep-Alive"] = f"timeout={int(self.keep_alive)}"
+        out.update(headers or {})
+        lines += [f"{k}: {v}" for k, v in out.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    # ---------- routing ----------
+    async def dispatch(self, req: Request):
+        if req.method == "OPTIONS":
+            return 204, None, {"Access-Control-Allow-Methods": "GET, POST, PATCH, DELETE, OPTIONS",
+                               "Access-Control-Allow-Headers": "Content-Type, If-None-Match"}
+        route = req.parts[0] if req.parts else ""
+        if route == "menu" and len(req.parts) == 1 and req.method == "GET":
+            return await self.get_menu(req)
+        if route == "sessions" and len(req.parts) == 1 and req.method == "POST":
+            return 201, {"session": secrets.token_urlsafe(12)}, {}
+        if route == "cart" and len(req.parts) >= 2:
+            return await self.cart(req, req.parts[1], req.parts[2:])
+        if route == "reports" and len(req.parts) == 2 and req.method == "GET":
+            return await self.report(req, req.parts[1])
+        raise HTTPError(404, f"No route for {req.method} /{'/'.join(req.parts)}")
+
+    async def get_menu(self, req: Request):
+        if "q" in req.query:
+            names = await self.run_app(self.app.search_menu, req.query["q"])
+            return 200, {"items": names}, {}
+        cached = self._menu
+        if cached is None or cached[0] != self.app.inventory_version:
+            cached = self._menu = await self.run_app(self._build_menu)
+        _, body, etag = cached
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag in [t.strip() for t in req.headers.get("if-none-match", "").split(",")]:
+            return 304, None, headers
+        return 200, body, headers
+
+    def _build_menu(self) -> Tuple[int, bytes, str]:
+        version, inventory = self.app.menu_snapshot()
+        body = json.dumps(inventory, sort_keys=True).encode("utf-8")
+        return version, body, '"%s"' % hashlib.sha1(body).hexdigest()
+
+    async def cart(self, req: Request, session: str, rest):
+        app = self.app
+        if not rest:
+            if req.method == "GET":
+                return 200, await self.run_app(app.cart, session), {}
+            if req.method == "DELETE":
+                await self.run_app(app.close_session, session)
+                return 204, None, {}
+        elif rest == ["items"] and req.method == "POST":
+            data = req.json()
+            item, quantity = str(data.get("item", "")).lower(), data.get("quantity", 1)
+            if not isinstance(quantity, int) or quantity <= 0:
+                raise HTTPError(400, "quantity must be a positive integer.")
+            return await self._cart_change(session, item, app.add_to_order, item, quantity, session=session)
+        elif len(rest) == 2 and rest[0] == "items":
+            item = rest[1].lower()
+            if req.method == "PATCH":
+                change = req.json().get("change")
+                if not isinstance(change, int):
+                    raise HTTPError(400, "change must be an integer.")
+                return await self._cart_change(session, item, app.update_order_quantity, item, change, session=session)
+            if req.method == "DELETE":
+                return await self._cart_change(session, item, app.remove_from_order, item, session=session)
+        elif rest == ["checkout"] and req.method == "POST":
+            payment = str(req.json().get("payment_method", "cash"))
+            # raise_errors: a failed save is a 500, only empty carts and stock conflicts are 409s
+            ok, msg = await self.run_app(app.checkout, payment, session=session, raise_errors=True)
+            if not ok:
+                raise HTTPError(409, msg)
+            return 200, {"receipt": msg}, {}
+        known = not rest or rest in (["items"], ["checkout"]) or (len(rest) == 2 and rest[0] == "items")
+        raise HTTPError(405 if known else 404)
+
+    async def _cart_change(self, sid: str, item: str, fn, *args, **kwargs):
+        """Apply an app order method to cart sid; 409 with its message when it left the cart unchanged."""
+        if item not in self.app.inventory:
+            raise HTTPError(404, f"{item.capitalize()} not found in menu.")
+
+        def change():
+            before = self.app.cart(sid)
+            message = fn(*args, **kwargs)
+            return before, message, self.app.cart(sid)
+
+        before, message, after = await self.run_app(change)
+        if before["lines"] == after["lines"]:
+            raise HTTPError(409, message)
+        return 200, {"message": message, "cart": after}, {}
+
+    async def report(self, req: Request, name: str):
+        if name == "summary":
+            period = req.query.get("period", "daily")
+            return 200, await self.run_app(self.app.sales_summary, period), {}
+        if name == "sales":
+            try:
+                limit = min(max(int(req.query.get("limit", 100)), 1), 1000)
+                after = int(req.query["after"]) if "after" in req.query else None
+            except ValueError:
+                raise HTTPError(400, "limit and after must be integers.")
+            # ordered by id, so the keyset cursor (order_by value, id) is (after, after)
+            rows = await self.run_app(self.app.db.sales_page, limit, order_by="id", descending=True,
+                                      after=(after, after) if after is not None else None,
+                                      search=req.query.get("q", ""))
+            return 200, {"rows": rows, "next": rows[-1]["id"] if len(rows) == limit else None}, {}
+        raise HTTPError(404, f"Unknown report {name!r}")
+
+    # ---------- lifecycle ----------
+    async def _expire_sessions(self):
+        while True:
+            await asyncio.sleep(min(60.0, self.session_idle))
+            try:
+                await self.run_app(self.app.sessions.expire_idle, self.session_idle)
+            except Exception as e:  # e.g. 503 while the pool is busy; try again next round
+                print(f"session expiry failed: {e}", file=sys.stderr)
+
+    async def serve(self, host: str, port: int):
+        server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_HEADER_BYTES)
+        reaper = asyncio.create_task(self._expire_sessions())
+        print(f"POS API on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            reaper.cancel()
+            self._pool.shutdown(wait=True)
+            self.app.store.flush()
+            self.app.config.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=4, help="threads for app/SQLite calls")
+    parser.add_argument("--queue", type=int, default=64, help="requests allowed to wait for a worker before 503")
+    parser.add_argument("--keep-alive", type=float, default=15.0, help="idle seconds before a connection is closed")
+    parser.add_argument("--session-idle", type=float, default=1800.0, help="idle seconds before a cart is dropped")
+    args = parser.parse_args()
+    app = FoodSalesApp()
+    server = POSServer(app, workers=args.workers, queue=args.queue,
+                       keep_alive=args.keep_alive, session_idle=args.session_idle)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,37 @@
 import json
 import os
+import sys
 import sqlite3
 import hashlib
 import secrets
 import string
+import threading
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple
 
+# shared crash-safe JSON writer lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from jsonstore import CachedJSONFile, atomic_write_json
+from inventory import make_inventory_store
+from lowstock import LowStockIndex
+from order import Order
+from search import SearchIndex
+from sessions import DEFAULT_SESSION, SessionRegistry
+from auth import AuthService
+
 # Try to import user's modules (keeps compatibility). If missing, provide sensible fallbacks.
 try:
-    from datastore import SalesDB  # original expected DB wrapper
+    from datastore import SalesDB, InsufficientStock  # original expected DB wrapper
 except Exception:
+    class InsufficientStock(Exception):
+        def __init__(self, item: str):
+            super().__init__(f"Insufficient stock for {item}")
+            self.item = item
+
     # simple lightweight SalesDB fallback using sqlite3
     class SalesDB:
-        def __init__(self, path: str = None):
+        def __init__(self, path: str = None, storage: Optional[Dict[str, Any]] = None):
+            # storage profiles (PRAGMA tuning) need the real datastore; ignored here
             self.path = path or os.path.join(os.path.dirname(__file__), "sales.db")
             self._conn = sqlite3.connect(self.path, check_same_thread=False)
             self._conn.row_factory = sqlite3.Row
@@ -53,6 +71,25 @@ except Exception:
             rows = cur.fetchall()
             return [dict(r) for r in rows]
 
+        def sales_page(self, limit: int = 200, after: Optional[Tuple[Any, int]] = None,
+                       before: Optional[Tuple[Any, int]] = None, order_by: str = "id",
+                       descending: bool = True, search: str = "") -> List[Dict[str, Any]]:
+            # newest-first by id only; sorting by other columns needs the real datastore
+            where, params = [], []
+            if search:
+                where.append("(item LIKE ? OR order_id LIKE ? OR payment_method LIKE ?)")
+                params += [f"%{search}%"] * 3
+            if before is not None:
+                where.append("id > ?"); params.append(before[-1])
+            elif after is not None:
+                where.append("id < ?"); params.append(after[-1])
+            sql = "SELECT * FROM sales" + (" WHERE " + " AND ".join(where) if where else "")
+            sql += f" ORDER BY id {'ASC' if before is not None else 'DESC'} LIMIT ?"
+            rows = [dict(r) for r in self._conn.execute(sql, params + [limit]).fetchall()]
+            if before is not None:
+                rows.reverse()
+            return rows
+
         def export_csv(self, path: str) -> str:
             import csv
             rows = self.all_sales()
@@ -73,7 +110,7 @@ except Exception:
             return [dict(r) for r in cur.fetchall()]
 
 try:
-    from security import hash_password, verify_password, generate_password
+    from security import hash_password, hash_rounds, verify_password, generate_password
 except Exception:
     # simple security fallback (bcrypt would be better; this is compatible but basic)
     def _salted_hash(password: str, salt: Optional[str] = None) -> Tuple[str, str]:
@@ -82,11 +119,14 @@ except Exception:
         h = hashlib.sha256((salt + password).encode("utf-8")).hexdigest()
         return salt, h
 
-    def hash_password(password: str) -> str:
+    def hash_password(password: str, rounds: Optional[int] = None) -> str:
         salt, h = _salted_hash(password)
         # store as salt$hash
         return f"{salt}${h}"
 
+    def hash_rounds(stored: str) -> int:
+        return 0  # no cost factor to upgrade
+
     def verify_password(password: str, stored: Optional[str]) -> bool:
         if not stored:
             return False
@@ -111,11 +151,60 @@ class FoodSalesApp:
     def __init__(self, menu_file: str = MENU_FILE, config_file: str = CONFIG_FILE):
         self.menu_file = menu_file
         self.config_file = config_file
-        self.inventory: Dict[str, Dict[str, Any]] = self._load_json(self.menu_file, default={})
-        self.order: Dict[str, int] = {}  # item -> qty
-        self.last_removed: Optional[Tuple[str, int]] = None  # for undo (item, qty)
-        self.db = SalesDB()
+        # one cart per till/session; carts only hold stock, checkout takes it (see sessions.py)
+        self.sessions = SessionRegistry(lambda item: self.inventory[item]["price"])
+        self._lock = threading.RLock()  # in-memory inventory and carts, shared by till threads
+        self.inventory_version = 0  # bumped on every inventory change (menu caches/ETags key on it)
+        # config is read from memory; pref changes are batched, password changes written through
+        self.config = CachedJSONFile(self.config_file, flush_delay=1.0)
         self._ensure_config()
+        cfg = self.config.data()
+        # bcrypt runs on worker threads; the GUI waits on the returned futures
+        self.auth = AuthService(verify_password, hash_password, rounds=cfg.get("bcrypt_rounds"))
+        self.db = SalesDB(storage=cfg.get("storage"))
+        self.store = make_inventory_store(cfg.get("inventory_backend", "json"), self.menu_file, self.db,
+                                          lock=self._lock, **cfg.get("menu_json", {}))
+        self.inventory: Dict[str, Dict[str, Any]] = self.store.load()
+        self._search_index: Optional[SearchIndex] = None  # built on first search
+        # items at/below their threshold, kept current per stock change (see lowstock.py)
+        low = cfg.get("low_stock", {})
+        self.low_stock = LowStockIndex(self.inventory, default=low.get("default", 5), thresholds=low.get("items"))
+
+    @property
+    def order(self) -> Order:
+        """This process's own cart (DEFAULT_SESSION): item -> qty, observable by the order panel."""
+        return self.sessions.get(DEFAULT_SESSION).order
+
+    @property
+    def last_removed(self) -> Optional[Tuple[str, int]]:
+        return self.sessions.get(DEFAULT_SESSION).last_removed
+
+    # ---------- Search ----------
+    @property
+    def search_index(self) -> SearchIndex:
+        # built and queried under _lock: API worker threads search while tills edit stock
+        with self._lock:
+            if self._search_index is None:
+                self._search_index = SearchIndex(self.inventory)
+            return self._search_index
+
+    def _reindex(self, item: Optional[str] = None):
+        """Keep a built search index in step with inventory edits (item=None: after a bulk reload)."""
+        if self._search_index is None:
+            return
+        if item is None:
+            self._search_index.refresh(self.inventory)
+        else:
+            self._search_index.update(item, self.inventory[item])
+
+    def search_menu(self, query: str = "", in_stock_only: bool = True) -> List[str]:
+        """Item names matching query (name, category or description), in name order."""
+        with self._lock:
+            index = self.search_index
+            names = index.ordered(index.search(query)) if query else index.names()
+            if in_stock_only:
+                return [n for n in names if self.inventory.get(n, {}).get("quantity", 0) > 0]
+            return list(names)
 
     # ---------- Data IO ----------
     def _load_json(self, filename: str, default: Any):
@@ -126,50 +215,73 @@ class FoodSalesApp:
             return default
 
     def _save_json(self, data: Any, filename: str):
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4)
+        atomic_write_json(filename, data, indent=4)
 
     # ---------- Config & Password ----------
     def _ensure_config(self):
-        cfg = self._load_json(self.config_file, default={})
-        changed = False
+        cfg = self.config.data()
+        updates: Dict[str, Any] = {}
+        if "bcrypt_rounds" not in cfg:
+            updates["bcrypt_rounds"] = 12  # cost of new hashes; older ones are redone at next login
         if "password" not in cfg:
             temp_pass = generate_password(14)
-            cfg["password"] = hash_password(temp_pass)
-            cfg["first_run_password"] = temp_pass  # show once in GUI
-            changed = True
+            updates["password"] = hash_password(temp_pass, cfg.get("bcrypt_rounds", updates.get("bcrypt_rounds")))
+            updates["first_run_password"] = temp_pass  # show once in GUI
         # preferences
         if "prefs" not in cfg:
-            cfg["prefs"] = {"dark_mode": False, "last_window": None}
-            changed = True
-        if changed:
-            self._save_json(cfg, self.config_file)
+            updates["prefs"] = {"dark_mode": False, "last_window": None}
+        # sales.db tuning: only overrides go here, e.g. {"synchronous": "full"}; SalesDB merges
+        # them over datastore.DEFAULT_STORAGE, so new defaults reach existing installs
+        if "storage" not in cfg:
+            updates["storage"] = {}
+        # "json" rewrites menu.json per change; "sqlite" keeps stock in sales.db (see inventory.py)
+        if "inventory_backend" not in cfg:
+            updates["inventory_backend"] = "json"
+        # low-stock alerts: qty <= default, or the item's own threshold under "items"
+        if "low_stock" not in cfg:
+            updates["low_stock"] = {"default": 5, "items": {}}
+        if updates:
+            with self.config.edit() as cfg:
+                cfg.update(updates)
 
     def get_prefs(self) -> Dict[str, Any]:
-        cfg = self._load_json(self.config_file, default={})
-        return cfg.get("prefs", {})
+        return dict(self.config.data().get("prefs", {}))
 
     def set_pref(self, key: str, value: Any):
-        cfg = self._load_json(self.config_file, default={})
-        prefs = cfg.setdefault("prefs", {})
-        prefs[key] = value
-        self._save_json(cfg, self.config_file)
+        with self.config.edit(batch=True) as cfg:
+            cfg.setdefault("prefs", {})[key] = value
 
     def validate_password(self, password: str) -> bool:
-        cfg = self._load_json(self.config_file, default={})
-        return verify_password(password, cfg.get("password"))
+        stored = self.config.data().get("password")
+        if not verify_password(password, stored):
+            return False
+        if self.auth.rounds and hash_rounds(stored) not in (0, self.auth.rounds):
+            # bcrypt_rounds changed since this hash was made: redo it while we have the password
+            hashed = hash_password(password, self.auth.rounds)
+            with self.config.edit() as cfg:
+                if cfg.get("password") == stored:  # not changed meanwhile
+                    cfg["password"] = hashed
+        return True
+
+    def validate_password_async(self, password: str):
+        """Future[bool]; bcrypt (and any rehash) runs on the auth worker pool."""
+        return self.auth.submit(self.validate_password, password)
 
     def consume_first_run_password(self) -> Optional[str]:
-        cfg = self._load_json(self.config_file, default={})
-        temp = cfg.pop("first_run_password", None)
-        self._save_json(cfg, self.config_file)
-        return temp
+        if "first_run_password" not in self.config.data():
+            return None
+        with self.config.edit() as cfg:
+            return cfg.pop("first_run_password", None)
 
     def change_password(self, new_password: str):
-        cfg = self._load_json(self.config_file, default={})
-        cfg["password"] = hash_password(new_password)
-        cfg.pop("first_run_password", None)
-        self._save_json(cfg, self.config_file)
+        hashed = hash_password(new_password, self.auth.rounds)
+        with self.config.edit() as cfg:
+            cfg["password"] = hashed
+            cfg.pop("first_run_password", None)
+
+    def change_password_async(self, new_password: str):
+        """Future[None]; hashes and saves the new password on the auth worker pool."""
+        return self.auth.submit(self.change_password, new_password)
 
     # ---------- Inventory ----------
     def add_update_item(self, item: str, quantity: int, price: float, description: str = "", category: str = "Uncategorized") -> str:
@@ -178,132 +290,281 @@ class FoodSalesApp:
             return "Quantity cannot be negative."
         if price < 0:
             return "Price cannot be negative."
-        entry = self.inventory.get(item)
+        with self._lock:
+            entry = self.inventory.get(item)
+            if entry:
+                if price > 0:
+                    entry["price"] = float(price)
+                if description:
+                    entry["description"] = description
+                if category:
+                    entry["category"] = category
+            else:
+                self.inventory[item] = {
+                    "quantity": 0,
+                    "price": float(price),
+                    "description": description or "No description.",
+                    "category": category or "Uncategorized",
+                }
+            # added to the stored quantity, so sales made meanwhile on other tills are kept
+            qty = self.store.restock(self.inventory, item, int(quantity))
+            self.inventory_version += 1
+            self._reindex(item)
+            self.low_stock.update(item, qty)
         if entry:
-            entry["quantity"] = int(entry.get("quantity", 0)) + int(quantity)
-            if price > 0:
-                entry["price"] = float(price)
-            if description:
-                entry["description"] = description
-            if category:
-                entry["category"] = category
-            feedback = f"Updated {item.capitalize()} to qty={entry['quantity']}."
-        else:
-            self.inventory[item] = {
-                "quantity": int(quantity),
-                "price": float(price),
-                "description": description or "No description.",
-                "category": category or "Uncategorized",
-            }
-            feedback = f"Added {quantity} {item.capitalize()}."
-        self._save_json(self.inventory, self.menu_file)
-        return feedback
+            return f"Updated {item.capitalize()} to qty={qty}."
+        return f"Added {quantity} {item.capitalize()}."
 
     def update_item_price(self, item: str, price: float) -> str:
         item = item.lower()
         if item in self.inventory and price >= 0:
-            self.inventory[item]["price"] = float(price)
-            self._save_json(self.inventory, self.menu_file)
+            with self._lock:
+                self.inventory[item]["price"] = float(price)
+                self.store.save(self.inventory, [item])
+                self.inventory_version += 1
+                for session in self.sessions.all():
+                    session.order.reprice(item)
             return f"{item.capitalize()} price updated to ${price:.2f}"
         return f"{item.capitalize()} not found or invalid price."
 
-    def low_stock_items(self, threshold: int = 5) -> List[Tuple[str, int]]:
-        results = []
-        for k, v in self.inventory.items():
-            if int(v.get("quantity", 0)) <= threshold:
-                results.append((k, int(v.get("quantity", 0))))
-        return results
+    def low_stock_items(self, threshold: Optional[int] = None) -> List[Tuple[str, int]]:
+        """(item, qty) at or below the configured thresholds, lowest first; an explicit threshold rescans."""
+        with self._lock:  # checkouts update the index and quantities from other threads
+            if threshold is None:
+                return self.low_stock.low_items()
+            results = []
+            for k, v in self.inventory.items():
+                if int(v.get("quantity", 0)) <= threshold:
+                    results.append((k, int(v.get("quantity", 0))))
+            return results
+
+    def set_low_stock_threshold(self, item: str, threshold: Optional[int]) -> str:
+        """Per-item alert level (None: back to the default)."""
+        item = item.strip().lower()
+        if threshold is not None and threshold < 0:
+            return "Threshold cannot be negative."
+        with self.config.edit() as cfg:
+            items = cfg.setdefault("low_stock", {"default": self.low_stock.default, "items": {}}).setdefault("items", {})
+            if threshold is None:
+                items.pop(item, None)
+            else:
+                items[item] = int(threshold)
+        with self._lock:
+            self.low_stock.set_threshold(item, threshold)
+        if threshold is None:
+            return f"{item.capitalize()} uses the default low-stock level ({self.low_stock.default})."
+        return f"{item.capitalize()} low-stock level set to {threshold}."
 
     # ---------- Order ----------
-    def clear_order(self):
-        self.order.clear()
-        self.last_removed = None
+    # Every order method takes the session (till or API client) whose cart it works on.
+    def available(self, item: str, session: str = DEFAULT_SESSION) -> int:
+        """Stock session may still put in its cart: on hand minus what other carts hold."""
+        return int(self.inventory.get(item, {}).get("quantity", 0)) - self.sessions.held(item, exclude=session)
 
-    def add_to_order(self, item: str, quantity: int) -> str:
+    def clear_order(self, session: str = DEFAULT_SESSION):
+        state = self.sessions.get(session)
+        state.order.clear()
+        state.last_removed = None
+
+    def close_session(self, session: str):
+        """Forget a till's cart (its holds are released)."""
+        self.sessions.close(session)
+
+    def add_to_order(self, item: str, quantity: int, session: str = DEFAULT_SESSION) -> str:
         item = item.lower()
         if item not in self.inventory:
             return f"{item.capitalize()} not found in menu."
         if quantity <= 0:
             return "Quantity must be positive."
-        new_qty = self.order.get(item, 0) + int(quantity)
-        if new_qty > self.inventory[item]["quantity"]:
-            return f"Insufficient stock for {item.capitalize()}. Only {self.inventory[item]['quantity']} available."
-        self.order[item] = new_qty
+        with self._lock:
+            order = self.sessions.get(session).order
+            new_qty = order.get(item, 0) + int(quantity)
+            available = self.available(item, session)
+            if new_qty > available:
+                return f"Insufficient stock for {item.capitalize()}. Only {max(available, 0)} available."
+            order[item] = new_qty
         return f"Added/Updated {item.capitalize()} to quantity {new_qty}."
 
-    def update_order_quantity(self, item: str, change: int) -> str:
+    def update_order_quantity(self, item: str, change: int, session: str = DEFAULT_SESSION) -> str:
         item = item.lower()
-        if item not in self.order:
-            return "Item not found in order."
-        new_qty = self.order[item] + int(change)
-        if new_qty <= 0:
-            removed_qty = self.order.pop(item, None)
-            self.last_removed = (item, removed_qty or 0)
-            return f"{item.capitalize()} removed from order."
-        if new_qty > self.inventory[item]["quantity"]:
-            return f"Insufficient stock. Only {self.inventory[item]['quantity']} available."
-        self.order[item] = new_qty
+        with self._lock:
+            state = self.sessions.get(session)
+            if item not in state.order:
+                return "Item not found in order."
+            new_qty = state.order[item] + int(change)
+            if new_qty <= 0:
+                removed_qty = state.order.pop(item, None)
+                state.last_removed = (item, removed_qty or 0)
+                return f"{item.capitalize()} removed from order."
+            available = self.available(item, session)
+            if new_qty > available:
+                return f"Insufficient stock. Only {max(available, 0)} available."
+            state.order[item] = new_qty
         return "Quantity updated."
 
-    def remove_from_order(self, item: str) -> str:
+    def remove_from_order(self, item: str, session: str = DEFAULT_SESSION) -> str:
         item = item.lower()
-        removed = self.order.pop(item, None)
-        if removed is not None:
-            self.last_removed = (item, removed)
-            return f"{item.capitalize()} removed."
+        with self._lock:
+            state = self.sessions.get(session)
+            removed = state.order.pop(item, None)
+            if removed is not None:
+                state.last_removed = (item, removed)
+                return f"{item.capitalize()} removed."
         return f"{item.capitalize()} was not in the order."
 
-    def undo_last_removal(self) -> str:
-        if not self.last_removed:
-            return "Nothing to undo."
-        item, qty = self.last_removed
-        if self.inventory.get(item, {}).get("quantity", 0) < qty:
-            return f"Cannot undo — only {self.inventory.get(item, {}).get('quantity',0)} in stock."
-        self.order[item] = self.order.get(item, 0) + qty
-        self.last_removed = None
+    def undo_last_removal(self, session: str = DEFAULT_SESSION) -> str:
+        with self._lock:
+            state = self.sessions.get(session)
+            if not state.last_removed:
+                return "Nothing to undo."
+            item, qty = state.last_removed
+            available = self.available(item, session) - state.order.get(item, 0)
+            if available < qty:
+                return f"Cannot undo — only {max(available, 0)} in stock."
+            state.order[item] = state.order.get(item, 0) + qty
+            state.last_removed = None
         return f"Restored {qty} x {item.capitalize()} to order."
 
-    # ---------- Checkout ----------
-    def checkout(self, payment_method: str) -> Tuple[bool, str]:
-        if not self.order:
-            return False, "Your order is empty!"
-
-        # Verify stock
-        for item, qty in self.order.items():
-            if self.inventory.get(item, {}).get("quantity", 0) < qty:
-                return False, f"Checkout failed: Insufficient stock for {item.capitalize()}."
-
-        # Build items list and deduct
-        items = []
-        total = 0.0
-        for item, qty in list(self.order.items()):
-            price = float(self.inventory[item]["price"])
-            subtotal = round(price * qty, 2)
-            total += subtotal
-            items.append({
-                "item": item,
-                "quantity": qty,
-                "price_per_item": price,
-                "total_price": subtotal
-            })
-            # deduct inventory
-            self.inventory[item]["quantity"] -= qty
-
-        # Save inventory first (so crash after DB won't lose stock state)
-        try:
-            self._save_json(self.inventory, self.menu_file)
-        except Exception as e:
-            return False, f"Internal error saving inventory: {e}"
+    def cart(self, session: str = DEFAULT_SESSION) -> Dict[str, Any]:
+        """The session's cart as plain data: lines (item, quantity, price, subtotal) and total."""
+        with self._lock:
+            order = self.sessions.get(session).order
+            lines = [
+                {"item": item, "quantity": qty, "price": float(self.inventory[item]["price"]),
+                 "subtotal": order.subtotal(item)}
+                for item, qty in order.items()
+            ]
+            return {"session": session, "lines": lines, "total": order.total}
+
+    def menu_snapshot(self) -> Tuple[int, Dict[str, Dict[str, Any]]]:
+        """(inventory_version, copy of the inventory) read together."""
+        with self._lock:
+            return self.inventory_version, {k: dict(v) for k, v in self.inventory.items()}
+
+    def _sync_stock(self, items: List[str]):
+        """Take the stock authority's quantities for items (other tills may have sold some)."""
+        levels = self.store.stock(items)
+        with self._lock:
+            self.inventory_version += 1
+            for item, qty in levels.items():
+                if item in self.inventory:
+                    self.inventory[item]["quantity"] = qty
+                    self.low_stock.update(item, qty)
+
+    def _sync_items(self, items: List[str]):
+        """Take the stored records of items (price, description and stock other tills changed)."""
+        records = self.store.records(items)
+        with self._lock:
+            self.inventory_version += 1
+            for item, record in records.items():
+                current = self.inventory.get(item)
+                repriced = current is not None and current.get("price") != record.get("price")
+                if current is None:
+                    self.inventory[item] = record
+                else:
+                    current.update(record)
+                self._reindex(item)
+                self.low_stock.update(item, record["quantity"])
+                if repriced:
+                    for s in self.sessions.all():
+                        s.order.reprice(item)
+
+    def refresh_inventory(self):
+        """
+        Reload the whole inventory from the store (items added or repriced by other tills).
+        The GUI calls it when the ordering screen is shown, with the shared sqlite store.
+        """
+        inventory = self.store.load()
+        with self._lock:
+            for item in [k for k in self.inventory if k not in inventory]:
+                del self.inventory[item]
+            self.inventory.update(inventory)
+            self.inventory_version += 1
+            self._reindex()
+            self.low_stock.refresh(self.inventory)
 
-        # Persist sale
-        try:
-            order_id = self.db.add_order(items, payment_method=payment_method)
-        except Exception as e:
-            # rollback inventory change (best-effort)
-            for it in items:
-                self.inventory[it["item"]]["quantity"] += it["quantity"]
-            self._save_json(self.inventory, self.menu_file)
-            return False, f"Internal error saving order: {e}"
+    # ---------- Checkout ----------
+    def checkout(self, payment_method: str, session: str = DEFAULT_SESSION,
+                 raise_errors: bool = False) -> Tuple[bool, str]:
+        """
+        (True, receipt) or (False, reason) for an empty cart or missing stock. A failure to
+        save is (False, "Internal error ...") too, unless raise_errors: then the exception
+        propagates, so callers such as the API can tell it from a stock conflict.
+        """
+        if self.store.transactional:
+            # other tills may have repriced these: the sale is priced from the shared table
+            self._sync_items(list(self.sessions.get(session).order))
+        with self._lock:
+            order = self.sessions.get(session).order
+            if not order:
+                return False, "Your order is empty!"
+
+            # Verify stock (the sqlite store checks it against the shared table instead)
+            for item, qty in order.items():
+                if item not in self.inventory or (not self.store.transactional and self.inventory[item]["quantity"] < qty):
+                    return False, f"Checkout failed: Insufficient stock for {item.capitalize()}."
+
+            # Build items list
+            items = []
+            total = 0.0
+            for item, qty in list(order.items()):
+                price = float(self.inventory[item]["price"])
+                subtotal = round(price * qty, 2)
+                total += subtotal
+                items.append({
+                    "item": item,
+                    "quantity": qty,
+                    "price_per_item": price,
+                    "total_price": subtotal,
+                    "category": self.inventory[item].get("category", "Uncategorized"),
+                })
+        names = [it["item"] for it in items]
+
+        if self.store.transactional:
+            # stock deduction and sale rows commit (or roll back) together; the guarded UPDATE
+            # is the shared authority, so this runs outside the lock and tills commit concurrently
+            try:
+                order_id = self.db.add_order(items, payment_method=payment_method, deduct_stock=True)
+            except InsufficientStock as e:
+                self._sync_stock(names)  # another till got there first; the cart is kept
+                left = self.inventory.get(e.item, {}).get("quantity", 0)
+                return False, f"Checkout failed: Insufficient stock for {e.item.capitalize()}. Only {left} left."
+            except Exception as e:
+                if raise_errors:
+                    raise
+                return False, f"Internal error saving order: {e}"
+            self._sync_stock(names)
+        else:
+            # menu.json has no guarded update: one till per file, checkouts serialized here
+            with self._lock:
+                for it in items:
+                    self.inventory[it["item"]]["quantity"] -= it["quantity"]
+                self.inventory_version += 1
+
+                # Save inventory first (so crash after DB won't lose stock state); flushed even
+                # with a menu_json flush_delay, the sale must not be recorded before the stock
+                try:
+                    self.store.save(self.inventory, names)
+                    self.store.flush()
+                except Exception as e:
+                    if raise_errors:
+                        raise
+                    return False, f"Internal error saving inventory: {e}"
+
+                # Persist sale
+                try:
+                    order_id = self.db.add_order(items, payment_method=payment_method)
+                except Exception as e:
+                    # rollback inventory change (best-effort)
+                    for it in items:
+                        self.inventory[it["item"]]["quantity"] += it["quantity"]
+                    self.store.save(self.inventory, names)
+                    self.store.flush()
+                    if raise_errors:
+                        raise
+                    return False, f"Internal error saving order: {e}"
+                for it in items:
+                    self.low_stock.update(it["item"], self.inventory[it["item"]]["quantity"])
 
         # Build receipt text
         receipt_lines = ["--- Receipt ---"]
@@ -314,9 +575,13 @@ class FoodSalesApp:
         receipt_lines.append(f"Order ID: {order_id}")
         receipt_text = "\n".join(receipt_lines)
 
-        self.clear_order()
+        self.clear_order(session)
         return True, receipt_text
 
+    def export_inventory_json(self, path: str) -> str:
+        """Write the current inventory in menu.json format, whatever the backend."""
+        return self.store.export_json(self.inventory, path)
+
     def save_receipt_pdf(self, receipt_text: str, out_path: str) -> str:
         """
         Attempts to save a PDF receipt using reportlab. If library missing, falls back to .txt.
@@ -361,6 +626,18 @@ class FoodSalesApp:
 
         start_iso = start.isoformat()
         end_iso = now.isoformat()
+        if hasattr(self.db, "totals"):
+            # whole days come from the daily rollups; end=None means "up to now"
+            totals = self.db.totals(start_iso)
+            return {
+                "period": period,
+                "start": start_iso,
+                "end": end_iso,
+                "total_income": totals["total_income"],
+                "total_items": totals["total_items"],
+                "orders_count": totals["orders_count"],
+            }
+
         try:
             rows = self.db.sales_between(start_iso, end_iso) if hasattr(self.db, "sales_between") else self.db.all_sales()
         except Exception:
@@ -0,0 +1,33 @@
+"""
+Password hashing/verification off the caller's thread.
+
+bcrypt is deliberately slow (~250 ms at cost 12), and calling it from the Tk event
+loop freezes the window. AuthService runs it on a small worker pool and hands back
+concurrent.futures.Future objects; the GUI polls them with master.after, so the
+callback always runs on the Tk thread. bcrypt releases the GIL while hashing, so the
+main thread keeps repainting meanwhile.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+
+class AuthService:
+    def __init__(self, verify: Callable[[str, str], bool], hasher: Callable[..., str],
+                 rounds: Optional[int] = None, workers: int = 2):
+        self._verify = verify
+        self._hasher = hasher
+        self.rounds = rounds
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="auth")
+
+    def verify_async(self, password: str, stored: Optional[str]) -> "Future[bool]":
+        return self._pool.submit(self._verify, password, stored)
+
+    def hash_async(self, password: str) -> "Future[str]":
+        return self._pool.submit(self._hasher, password, self.rounds)
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """Run any other bcrypt-bound call (e.g. hash-and-save) on the pool."""
+        return self._pool.submit(fn, *args)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
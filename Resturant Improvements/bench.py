@@ -0,0 +1,244 @@
+"""
+Micro-benchmarks for the sales datastore.
+
+    python bench.py orders [--orders 300] [--sizes 1 10 100] [--tills 6]
+    python bench.py storage [--seconds 3] [--rows 20000]
+    python bench.py auth [--rounds 4 6 8 10 12 14] [--tries 5]
+    python bench.py charts [--rows 1000000] [--days 365]
+
+Every run uses a throwaway database in a temp directory; sales.db is never touched.
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+from datastore import SalesDB, DEFAULT_STORAGE, LEGACY_STORAGE
+
+
+def make_items(n: int) -> List[Dict[str, Any]]:
+    return [
+        {"item": f"item{i}", "quantity": 2, "price_per_item": 4.5, "total_price": 9.0}
+        for i in range(n)
+    ]
+
+
+def legacy_add_order(db: SalesDB, items: List[Dict[str, Any]], payment_method: str = "cash") -> str:
+    """The pre-batching write path: one execute per line item, one commit per order."""
+    order_id, ts = db._new_order_key()
+    cur = db._conn.cursor()
+    for it in items:
+        cur.execute(
+            "INSERT INTO sales (order_id,item,quantity,price_per_item,total_price,payment_method,timestamp) VALUES (?,?,?,?,?,?,?)",
+            (order_id, it["item"], it["quantity"], it["price_per_item"], it["total_price"], payment_method, ts),
+        )
+    db._conn.commit()
+    return order_id
+
+
+def fresh_db(tmpdir: str, name: str, **kwargs) -> SalesDB:
+    path = os.path.join(tmpdir, f"{name}.db")
+    if os.path.exists(path):
+        os.remove(path)
+    return SalesDB(path, **kwargs)
+
+
+def timed(fn: Callable[[], None]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def bench_orders(args):
+    print(f"{'lines/order':>11}  {'mode':<22}{'orders/sec':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            items = make_items(size)
+            results = {}
+
+            db = fresh_db(tmp, "legacy")
+            results["legacy (per-row)"] = timed(lambda: [legacy_add_order(db, items) for _ in range(args.orders)])
+            db.close()
+
+            db = fresh_db(tmp, "single")
+            results["add_order"] = timed(lambda: [db.add_order(items) for _ in range(args.orders)])
+            db.close()
+
+            db = fresh_db(tmp, "bulk")
+            results["add_orders (bulk)"] = timed(lambda: db.add_orders([(items, "cash")] * args.orders))
+            db.close()
+
+            db = fresh_db(tmp, "group", group_commit=True)
+            per_till = max(1, args.orders // args.tills)
+
+            def till():
+                for _ in range(per_till):
+                    db.add_order(items)
+
+            def run_tills():
+                threads = [threading.Thread(target=till) for _ in range(args.tills)]
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join()
+
+            elapsed = timed(run_tills)
+            results[f"group commit x{args.tills}"] = elapsed * args.orders / (per_till * args.tills)
+            db.close()
+
+            for mode, elapsed in results.items():
+                print(f"{size:>11}  {mode:<22}{args.orders / elapsed:>12.0f}")
+
+
+def bench_storage(args):
+    """Checkout writer and report reader running at the same time, per storage profile."""
+    from datetime import datetime, timedelta
+
+    print(f"{'profile':<10}{'writes/sec':>12}{'reads/sec':>12}{'worst read ms':>15}{'locked errors':>15}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, profile in (("legacy", LEGACY_STORAGE), ("wal", DEFAULT_STORAGE)):
+            db = fresh_db(tmp, name, storage=profile)
+            db.add_orders([(make_items(5), "cash")] * (args.rows // 5))
+            items = make_items(3)
+            stop = threading.Event()
+            counts = {"writes": 0, "reads": 0, "locked": 0, "worst": 0.0}
+
+            def writer():
+                while not stop.is_set():
+                    try:
+                        db.add_order(items)
+                        counts["writes"] += 1
+                    except Exception:
+                        counts["locked"] += 1
+
+            def reader():
+                start_iso = (datetime.utcnow() - timedelta(days=1)).isoformat()
+                while not stop.is_set():
+                    t0 = time.perf_counter()
+                    try:
+                        db.sales_between(start_iso, datetime.utcnow().isoformat())
+                        counts["reads"] += 1
+                    except Exception:
+                        counts["locked"] += 1
+                    counts["worst"] = max(counts["worst"], time.perf_counter() - t0)
+
+            threads = [threading.Thread(target=writer), threading.Thread(target=reader)]
+            for t in threads:
+                t.start()
+            time.sleep(args.seconds)
+            stop.set()
+            for t in threads:
+                t.join()
+            db.close()
+            print(f"{name:<10}{counts['writes'] / args.seconds:>12.0f}{counts['reads'] / args.seconds:>12.1f}"
+                  f"{counts['worst'] * 1000:>15.1f}{counts['locked']:>15}")
+
+
+def bench_auth(args):
+    """Login latency per bcrypt cost factor, and how long the calling thread stalls with/without AuthService."""
+    try:
+        from security import hash_password, verify_password
+    except ImportError:
+        print("bcrypt is not installed (pip install bcrypt).")
+        return
+    from auth import AuthService
+
+    def main_loop_stall(fn) -> float:
+        """Longest gap between 1 ms ticks of a stand-in event loop while fn's work is in flight."""
+        worst, last = 0.0, time.perf_counter()
+        fut = fn()
+        while True:
+            now = time.perf_counter()
+            worst, last = max(worst, now - last), now
+            if fut.done():
+                return worst
+            time.sleep(0.001)
+
+    class Done:
+        def done(self):
+            return True
+
+    print(f"{'cost':>4}{'hash ms':>10}{'verify ms':>11}{'inline stall ms':>17}{'pooled stall ms':>17}")
+    for rounds in args.rounds:
+        auth = AuthService(verify_password, hash_password, rounds=rounds)
+        stored = hash_password("correct horse", rounds)
+        hash_ms = min(timed(lambda: hash_password("correct horse", rounds)) for _ in range(args.tries)) * 1000
+        verify_ms = min(timed(lambda: verify_password("correct horse", stored)) for _ in range(args.tries)) * 1000
+
+        def inline():
+            verify_password("wrong", stored)  # what FoodSalesGUI used to do on the Tk thread
+            return Done()
+
+        inline_ms = main_loop_stall(inline) * 1000
+        pooled_ms = max(main_loop_stall(lambda: auth.verify_async("wrong", stored)) for _ in range(args.tries)) * 1000
+        auth.shutdown()
+        print(f"{rounds:>4}{hash_ms:>10.1f}{verify_ms:>11.1f}{inline_ms:>17.1f}{pooled_ms:>17.1f}")
+
+
+def bench_charts(args):
+    """Chart data per range: full load from the rollups, extending after new sales, and the old raw scan."""
+    from datetime import datetime, timedelta
+    from charts import RANGES, SalesSeries
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = fresh_db(tmp, "charts")
+        # spread args.rows sale lines over args.days days, a few lines per order
+        now = datetime.utcnow()
+        per_order = 4
+        n_orders = args.rows // per_order
+        keyed = []
+        for i in range(n_orders):
+            ts = (now - timedelta(seconds=(args.days * 86400) * i / n_orders)).isoformat()
+            keyed.append((f"o{i}", ts, (make_items(per_order), "cash"), False))
+            if len(keyed) == 20000:
+                db._write_orders(keyed)
+                keyed = []
+        if keyed:
+            db._write_orders(keyed)
+
+        print(f"{args.rows} sale lines over {args.days} days")
+        print(f"{'range':<26}{'load ms':>10}{'extend ms':>11}{'raw scan ms':>13}")
+        for label, (days, hourly) in RANGES.items():
+            series = SalesSeries(db, days, hourly)
+            load_ms = timed(series.refresh) * 1000
+            db.add_orders([(make_items(3), "card")] * 20)
+            extend_ms = timed(series.refresh) * 1000
+            first = (now.date() - timedelta(days=days - 1)).isoformat()
+            raw_ms = timed(lambda: db.aggregate(first, None, "hour" if hourly else "day")) * 1000
+            print(f"{label:<26}{load_ms:>10.1f}{extend_ms:>11.1f}{raw_ms:>13.1f}")
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("orders", help="orders/sec for the checkout write path")
+    p.add_argument("--orders", type=int, default=300)
+    p.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100])
+    p.add_argument("--tills", type=int, default=6, help="concurrent threads for the group-commit run")
+    p.set_defaults(func=bench_orders)
+
+    p = sub.add_parser("storage", help="concurrent checkout + report throughput, legacy journal vs WAL profile")
+    p.add_argument("--seconds", type=float, default=3.0)
+    p.add_argument("--rows", type=int, default=20000, help="sales rows preloaded before measuring")
+    p.set_defaults(func=bench_storage)
+
+    p = sub.add_parser("auth", help="login latency vs bcrypt cost factor, inline vs worker pool")
+    p.add_argument("--rounds", type=int, nargs="+", default=[4, 6, 8, 10, 12, 14])
+    p.add_argument("--tries", type=int, default=5)
+    p.set_defaults(func=bench_auth)
+
+    p = sub.add_parser("charts", help="chart series load/extend time vs aggregating raw sales")
+    p.add_argument("--rows", type=int, default=1000000, help="sales lines preloaded")
+    p.add_argument("--days", type=int, default=365, help="days of history they are spread over")
+    p.set_defaults(func=bench_charts)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
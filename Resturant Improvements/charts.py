@@ -0,0 +1,173 @@
+"""
+Sales charts embedded in the Tk window.
+
+SalesSeries holds the income series for one trailing window (N days by day, or N days by
+hour for the heatmap). The first load reads the rollup tables through
+SalesDB.chart_series(); after that, refresh() only asks for sales rows with an id above the
+last one seen and adds them in, so keeping a chart current costs a query over the new
+sales rather than the whole history. When the UTC day rolls over the window is reloaded.
+
+SalesChart draws those series into a FigureCanvasTkAgg inside a Tk frame, with a range
+selector. Queries run on a tasks.TaskRunner; drawing happens on the Tk thread, reusing one
+Figure. matplotlib is optional: check MATPLOTLIB_AVAILABLE before building a SalesChart.
+"""
+import threading
+import tkinter as tk
+from datetime import date, datetime, timedelta
+from tkinter import ttk
+from typing import Dict, Optional, Tuple
+
+try:
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    from matplotlib.figure import Figure
+    MATPLOTLIB_AVAILABLE = True
+except Exception:
+    MATPLOTLIB_AVAILABLE = False
+
+# label -> (days, hourly)
+RANGES: Dict[str, Tuple[int, bool]] = {
+    "Last 7 days": (7, False),
+    "Last 30 days": (30, False),
+    "Last 365 days": (365, False),
+    "Hourly heatmap (30 days)": (30, True),
+}
+
+
+class SalesSeries:
+    """Income per day (or per day and hour) over the last `days` UTC days, cached."""
+
+    def __init__(self, db, days: int, hourly: bool = False):
+        self.db = db
+        self.days = days
+        self.hourly = hourly
+        self.last_id: Optional[int] = None
+        self.first_day: Optional[date] = None
+        self.income: Dict[str, float] = {}  # day -> income
+        self.grid: Dict[Tuple[str, int], float] = {}  # (day, hour) -> income
+        self._lock = threading.Lock()
+
+    def _window(self) -> Tuple[date, date]:
+        today = datetime.utcnow().date()
+        return today - timedelta(days=self.days - 1), today
+
+    def refresh(self):
+        """Load or extend the series; returns a (days, values) copy for drawing on another thread."""
+        with self._lock:
+            first, last = self._window()
+            reload = self.last_id is None or first != self.first_day
+            rows, last_id = self.db.chart_series(first.isoformat(), last.isoformat(), self.hourly,
+                                                 None if reload else self.last_id)
+            if reload:
+                self.income.clear()
+                self.grid.clear()
+                self.first_day = first
+            for row in rows:
+                if self.hourly:
+                    day, hour, income = row
+                    self.grid[(day, hour)] = self.grid.get((day, hour), 0.0) + income
+                else:
+                    day, income, _ = row
+                    self.income[day] = self.income.get(day, 0.0) + income
+            self.last_id = last_id
+            return self._plot_data(first)
+
+    def _plot_data(self, first: date):
+        days = [(first + timedelta(days=i)).isoformat() for i in range(self.days)]
+        if self.hourly:
+            return days, [[self.grid.get((d, h), 0.0) for h in range(24)] for d in days]
+        return days, [self.income.get(d, 0.0) for d in days]
+
+
+class SalesChart:
+    """Range selector + embedded canvas. Call refresh() (e.g. after a checkout) to pull in new sales."""
+
+    def __init__(self, parent, db, runner, bg: str = None, fg: str = None, auto_refresh_ms: int = 10000):
+        self.db = db
+        self.runner = runner
+        self.auto_refresh_ms = auto_refresh_ms
+        self.frame = tk.Frame(parent, bg=bg)
+        bar = tk.Frame(self.frame, bg=bg)
+        bar.pack(fill="x", pady=4)
+        tk.Label(bar, text="Range:", bg=bg, fg=fg).pack(side="left", padx=5)
+        self.range_var = tk.StringVar(value=next(iter(RANGES)))
+        box = ttk.Combobox(bar, textvariable=self.range_var, values=list(RANGES), state="readonly", width=26)
+        box.pack(side="left", padx=5)
+        box.bind("<<ComboboxSelected>>", lambda _: self.refresh())
+        self.status = tk.Label(bar, text="", bg=bg, fg=fg)
+        self.status.pack(side="left", padx=10)
+
+        self.figure = Figure(figsize=(8, 4), dpi=100)
+        self.ax = self.figure.add_subplot(111)
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self.frame)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        self._series: Dict[str, SalesSeries] = {}
+        self._colorbar = None
+        self._task = None
+        self._after = None
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+        self.refresh()
+
+    def _series_for(self, label: str) -> SalesSeries:
+        if label not in self._series:
+            days, hourly = RANGES[label]
+            self._series[label] = SalesSeries(self.db, days, hourly)
+        return self._series[label]
+
+    def refresh(self):
+        if not self.frame.winfo_exists():
+            return  # screen was left; stop auto-refreshing
+        if self._after is not None:
+            self.frame.after_cancel(self._after)
+            self._after = None
+        if self._task is not None:
+            self._task.cancel()
+        label = self.range_var.get()
+        series = self._series_for(label)
+        self.status.config(text="Loading…")
+        self._task = self.runner.submit(lambda t: series.refresh(), name="chart",
+                                        on_done=lambda data: self._draw(label, series, data),
+                                        on_error=self._failed)
+
+    def _failed(self, e):
+        self._task = None
+        if self.frame.winfo_exists():
+            self.status.config(text=f"Could not load sales: {e}")
+
+    def _draw(self, label: str, series: SalesSeries, data):
+        self._task = None
+        if not self.frame.winfo_exists():
+            return
+        days, values = data
+        if self._colorbar is not None:
+            self._colorbar.remove()
+            self._colorbar = None
+        self.ax.clear()
+        if series.hourly:
+            image = self.ax.imshow(values, aspect="auto", cmap="viridis", interpolation="nearest")
+            self.ax.set_xlabel("Hour (UTC)")
+            self.ax.set_xticks(range(0, 24, 3))
+            step = max(1, len(days) // 10)
+            self.ax.set_yticks(range(0, len(days), step))
+            self.ax.set_yticklabels([d[5:] for d in days[::step]])
+            self._colorbar = self.figure.colorbar(image, ax=self.ax, label="Income")
+        else:
+            self.ax.plot(range(len(days)), values, marker="o" if len(days) <= 31 else None)
+            step = max(1, len(days) // 10)
+            self.ax.set_xticks(range(0, len(days), step))
+            self.ax.set_xticklabels([d[5:] for d in days[::step]], rotation=45, ha="right")
+            self.ax.set_xlabel("Date")
+            self.ax.set_ylabel("Income")
+        self.ax.set_title(f"Sales ({label.lower()})")
+        self.figure.tight_layout()
+        self.canvas.draw_idle()
+        self.status.config(text=f"Updated {datetime.now().strftime('%H:%M:%S')}")
+        if self.auto_refresh_ms:
+            self._after = self.frame.after(self.auto_refresh_ms, self._auto_refresh)
+
+    def _auto_refresh(self):
+        self._after = None
+        # a hidden (cached) chart screen stops polling; showing it again calls refresh()
+        if self.frame.winfo_exists() and self.frame.winfo_ismapped():
+            self.refresh()
@@ -1,78 +1,840 @@
-import sqlite3
-import os
-from typing import Any, Dict, List
-
-
-class SalesDB:
-    """SQLite wrapper for sales records."""
-
-    def __init__(self, path: str = None):
-        self.path = path or os.path.join(os.path.dirname(__file__), "sales.db")
-        self._conn = sqlite3.connect(self.path, check_same_thread=False)
-        self._conn.row_factory = sqlite3.Row
-        self._ensure_table()
-
-    def _ensure_table(self):
-        cur = self._conn.cursor()
-        cur.execute(
-            """CREATE TABLE IF NOT EXISTS sales (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                order_id TEXT,
-                item TEXT,
-                quantity INTEGER,
-                price_per_item REAL,
-                total_price REAL,
-                payment_method TEXT,
-                timestamp TEXT
-            )"""
-        )
-        self._conn.commit()
-
-    def add_order(self, items: List[Dict[str, Any]], payment_method: str = "cash") -> str:
-        import secrets
-        from datetime import datetime
-
-        order_id = secrets.token_hex(6)
-        ts = datetime.utcnow().isoformat()
-        cur = self._conn.cursor()
-        for it in items:
-            cur.execute(
-                "INSERT INTO sales (order_id,item,quantity,price_per_item,total_price,payment_method,timestamp) VALUES (?,?,?,?,?,?,?)",
-                (
-                    order_id,
-                    it["item"],
-                    it["quantity"],
-                    it["price_per_item"],
-                    it["total_price"],
-                    payment_method,
-                    ts,
-                ),
-            )
-        self._conn.commit()
-        return order_id
-
-    def all_sales(self) -> List[Dict[str, Any]]:
-        cur = self._conn.cursor()
-        cur.execute("SELECT * FROM sales ORDER BY id DESC")
-        rows = cur.fetchall()
-        return [dict(r) for r in rows]
-
-    def export_csv(self, path: str) -> str:
-        import csv
-
-        rows = self.all_sales()
-        if not rows:
-            with open(path, "w", newline="", encoding="utf-8") as f:
-                f.write("")  # empty file
-            return path
-        keys = rows[0].keys()
-        with open(path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=keys)
-            writer.writeheader()
-            writer.writerows(rows)
-        return path
-
-    def sales_between(self, start_iso: str, end_iso: str) -> List[Dict[str, Any]]:
-        cur = self._conn.cursor()
-        cur.execute("SELECT * FROM sales WHERE timestamp BETWEEN ? AND ?", (start_iso, end_iso))
-        return [dict(r) for r in cur.fetchall()]
+import sqlite3
+import os
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Optional columnar export
+try:
+    import pyarrow
+    import pyarrow.parquet
+    PYARROW_AVAILABLE = True
+except Exception:
+    PYARROW_AVAILABLE = False
+
+SALES_COLUMNS = (
+    "id", "order_id", "item", "quantity", "price_per_item", "total_price", "payment_method", "timestamp", "category",
+)
+
+INSERT_SALE = (
+    "INSERT INTO sales (order_id,item,quantity,price_per_item,total_price,payment_method,timestamp,category) "
+    "VALUES (?,?,?,?,?,?,?,?)"
+)
+
+# Grouping keys accepted by SalesDB.aggregate -> SQL expression over sales.
+# Timestamps are UTC ISO strings, so date buckets are plain prefixes.
+AGGREGATE_GROUPS: Dict[str, str] = {
+    "hour": "substr(timestamp, 1, 13)",
+    "day": "substr(timestamp, 1, 10)",
+    "week": "strftime('%Y-W%W', timestamp)",
+    "month": "substr(timestamp, 1, 7)",
+    "item": "item",
+    "category": "COALESCE(category, 'Uncategorized')",
+    "payment_method": "payment_method",
+}
+
+# Grouping keys accepted by SalesDB.rollup -> SQL expression over the daily rollup tables.
+ROLLUP_GROUPS: Dict[str, str] = {
+    "day": "day",
+    "week": "strftime('%Y-W%W', day)",
+    "month": "substr(day, 1, 7)",
+    "item": "item",
+    "payment_method": "payment_method",
+}
+
+UPSERT_ITEM_ROLLUP = (
+    "INSERT INTO daily_sales_rollup (day,item,payment_method,quantity,income,orders) VALUES (?,?,?,?,?,?) "
+    "ON CONFLICT(day,item,payment_method) DO UPDATE SET quantity=quantity+excluded.quantity, "
+    "income=income+excluded.income, orders=orders+excluded.orders"
+)
+UPSERT_ORDER_ROLLUP = (
+    "INSERT INTO daily_order_rollup (day,payment_method,orders,quantity,income) VALUES (?,?,?,?,?) "
+    "ON CONFLICT(day,payment_method) DO UPDATE SET orders=orders+excluded.orders, "
+    "quantity=quantity+excluded.quantity, income=income+excluded.income"
+)
+UPSERT_HOUR_ROLLUP = (
+    "INSERT INTO hourly_sales_rollup (day,hour,orders,quantity,income) VALUES (?,?,?,?,?) "
+    "ON CONFLICT(day,hour) DO UPDATE SET orders=orders+excluded.orders, "
+    "quantity=quantity+excluded.quantity, income=income+excluded.income"
+)
+
+
+def _rebuild_rollups(conn: sqlite3.Connection):
+    """Recompute both daily rollup tables from the raw sales rows."""
+    conn.execute("DELETE FROM daily_sales_rollup")
+    conn.execute("DELETE FROM daily_order_rollup")
+    conn.execute(
+        """INSERT INTO daily_sales_rollup (day,item,payment_method,quantity,income,orders)
+           SELECT substr(timestamp,1,10), COALESCE(item,''), COALESCE(payment_method,''),
+                  COALESCE(SUM(quantity),0), COALESCE(SUM(total_price),0), COUNT(DISTINCT order_id)
+           FROM sales WHERE timestamp IS NOT NULL GROUP BY 1, 2, 3"""
+    )
+    conn.execute(
+        """INSERT INTO daily_order_rollup (day,payment_method,orders,quantity,income)
+           SELECT substr(timestamp,1,10), COALESCE(payment_method,''),
+                  COUNT(DISTINCT order_id), COALESCE(SUM(quantity),0), COALESCE(SUM(total_price),0)
+           FROM sales WHERE timestamp IS NOT NULL GROUP BY 1, 2"""
+    )
+
+
+def _rebuild_hourly_rollup(conn: sqlite3.Connection):
+    """Recompute hourly_sales_rollup (income per UTC day and hour) from the raw sales rows."""
+    conn.execute("DELETE FROM hourly_sales_rollup")
+    conn.execute(
+        """INSERT INTO hourly_sales_rollup (day,hour,orders,quantity,income)
+           SELECT substr(timestamp,1,10), CAST(substr(timestamp,12,2) AS INTEGER),
+                  COUNT(DISTINCT order_id), COALESCE(SUM(quantity),0), COALESCE(SUM(total_price),0)
+           FROM sales WHERE timestamp IS NOT NULL GROUP BY 1, 2"""
+    )
+
+# An order as accepted by add_orders: (line items, payment method)
+Order = Tuple[List[Dict[str, Any]], str]
+
+# Storage profile applied as PRAGMAs on every connection. config.json "storage" holds only
+# overrides (e.g. {"synchronous": "full"}), merged over these per key at startup.
+# WAL lets report queries read a consistent snapshot while a checkout is committing.
+DEFAULT_STORAGE: Dict[str, Any] = {
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -16000,  # negative = KiB
+    "temp_store": "memory",
+    "busy_timeout": 5000,  # ms
+}
+# What sales.db used before storage profiles existed (SQLite defaults)
+LEGACY_STORAGE: Dict[str, Any] = {
+    "journal_mode": "delete",
+    "synchronous": "full",
+    "mmap_size": 0,
+    "cache_size": -2000,
+    "temp_store": "default",
+    "busy_timeout": 5000,
+}
+# Ordered schema upgrades applied by SalesDB._migrate. Each entry is
+# (version, description, steps); a step is a SQL string or a callable taking
+# the connection. Every version runs once, in its own transaction, and is
+# recorded in schema_version. Append new versions; never edit shipped ones.
+MIGRATIONS: List[Tuple[int, str, List[Any]]] = [
+    (1, "index sales by timestamp, order_id and (item, timestamp)", [
+        "CREATE INDEX IF NOT EXISTS idx_sales_timestamp ON sales(timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_sales_order_id ON sales(order_id)",
+        "CREATE INDEX IF NOT EXISTS idx_sales_item_timestamp ON sales(item, timestamp)",
+    ]),
+    (2, "record the menu category on each sale line", [
+        "ALTER TABLE sales ADD COLUMN category TEXT",
+    ]),
+    (3, "daily rollups per (day, item, payment method) and per (day, payment method)", [
+        """CREATE TABLE IF NOT EXISTS daily_sales_rollup (
+            day TEXT NOT NULL,
+            item TEXT NOT NULL,
+            payment_method TEXT NOT NULL,
+            quantity INTEGER NOT NULL DEFAULT 0,
+            income REAL NOT NULL DEFAULT 0,
+            orders INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, item, payment_method)
+        ) WITHOUT ROWID""",
+        """CREATE TABLE IF NOT EXISTS daily_order_rollup (
+            day TEXT NOT NULL,
+            payment_method TEXT NOT NULL,
+            orders INTEGER NOT NULL DEFAULT 0,
+            quantity INTEGER NOT NULL DEFAULT 0,
+            income REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, payment_method)
+        ) WITHOUT ROWID""",
+        _rebuild_rollups,
+    ]),
+    (4, "inventory table for the sqlite inventory backend", [
+        """CREATE TABLE IF NOT EXISTS inventory (
+            item TEXT PRIMARY KEY,
+            quantity INTEGER NOT NULL,
+            price REAL NOT NULL,
+            description TEXT,
+            category TEXT
+        )""",
+    ]),
+    (5, "index sales by item and by total for the sortable sales grid", [
+        # an index on (col) also orders by rowid within equal values, i.e. by (col, id)
+        "CREATE INDEX IF NOT EXISTS idx_sales_item ON sales(item)",
+        "CREATE INDEX IF NOT EXISTS idx_sales_total_price ON sales(total_price)",
+    ]),
+    (6, "hourly rollup for the sales heatmap", [
+        """CREATE TABLE IF NOT EXISTS hourly_sales_rollup (
+            day TEXT NOT NULL,
+            hour INTEGER NOT NULL,
+            orders INTEGER NOT NULL DEFAULT 0,
+            quantity INTEGER NOT NULL DEFAULT 0,
+            income REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, hour)
+        ) WITHOUT ROWID""",
+        _rebuild_hourly_rollup,
+    ]),
+]
+
+
+class InsufficientStock(Exception):
+    """Raised when a stock-deducting order asks for more of an item than the inventory table holds."""
+
+    def __init__(self, item: str):
+        super().__init__(f"Insufficient stock for {item}")
+        self.item = item
+
+
+# columns the sales grid may ORDER BY (validated: they are interpolated into SQL)
+SORTABLE_COLUMNS = ("id", "order_id", "item", "quantity", "price_per_item", "total_price",
+                    "payment_method", "timestamp")
+
+_PRAGMA_CHOICES = {
+    "journal_mode": {"delete", "truncate", "persist", "memory", "wal", "off"},
+    "synchronous": {"off", "normal", "full", "extra"},
+    "temp_store": {"default", "file", "memory"},
+}
+
+
+class SalesDB:
+    """SQLite wrapper for sales records.
+
+    With ``group_commit=True`` concurrent ``add_order`` calls (one per till
+    thread) are queued and written by a single flusher thread, so checkouts
+    that queue up while the previous batch is being written share one
+    transaction and fsync. ``group_window`` optionally waits a little longer
+    for more tills to join a batch.
+
+    Writes go through ``_conn``; reads use a second connection (``_rconn``) so
+    that under WAL, reports never wait for the write lock.
+    """
+
+    sortable_columns = SORTABLE_COLUMNS
+
+    def __init__(self, path: str = None, storage: Optional[Dict[str, Any]] = None,
+                 group_commit: bool = False, group_window: float = 0.0, group_max: int = 256):
+        self.path = path or os.path.join(os.path.dirname(__file__), "sales.db")
+        self.storage = {**DEFAULT_STORAGE, **(storage or {})}
+        self._conn = self._connect()
+        self._lock = threading.RLock()
+        self._ensure_table()
+        self._migrate()
+        self._rconn = self._connect()
+        self._rlock = threading.RLock()
+
+        self.group_commit = group_commit
+        self.group_window = group_window
+        self.group_max = group_max
+        self._pending: List[Tuple[str, str, Order, bool, Future]] = []
+        self._pending_cv = threading.Condition()
+        self._closing = False
+        self._flusher: Optional[threading.Thread] = None
+        if group_commit:
+            self._flusher = threading.Thread(target=self._group_commit_loop, name="sales-group-commit", daemon=True)
+            self._flusher.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for key, value in self._storage_pragmas():
+            conn.execute(f"PRAGMA {key}={value}")
+        return conn
+
+    def _storage_pragmas(self) -> List[Tuple[str, Any]]:
+        pragmas = []
+        for key in ("journal_mode", "synchronous", "temp_store"):
+            value = str(self.storage[key]).lower()
+            if value not in _PRAGMA_CHOICES[key]:
+                raise ValueError(f"Invalid storage {key}: {self.storage[key]!r}")
+            pragmas.append((key, value))
+        for key in ("mmap_size", "cache_size", "busy_timeout"):
+            pragmas.append((key, int(self.storage[key])))
+        return pragmas
+
+    def _ensure_table(self):
+        cur = self._conn.cursor()
+        cur.execute(
+            """CREATE TABLE IF NOT EXISTS sales (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                order_id TEXT,
+                item TEXT,
+                quantity INTEGER,
+                price_per_item REAL,
+                total_price REAL,
+                payment_method TEXT,
+                timestamp TEXT
+            )"""
+        )
+        self._conn.commit()
+
+    def _migrate(self):
+        cur = self._conn.cursor()
+        cur.execute(
+            """CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT,
+                applied_at TEXT
+            )"""
+        )
+        self._conn.commit()
+        from datetime import datetime
+
+        for version, description, steps in MIGRATIONS:
+            if version <= self.schema_version():
+                continue
+            with self._lock, self._conn:
+                # IMMEDIATE takes the write lock up front so two tills starting
+                # together can't both run the same upgrade
+                self._conn.execute("BEGIN IMMEDIATE")
+                if version <= self.schema_version():
+                    continue
+                for step in steps:
+                    if callable(step):
+                        step(self._conn)
+                    else:
+                        self._conn.execute(step)
+                self._conn.execute(
+                    "INSERT INTO schema_version (version, description, applied_at) VALUES (?,?,?)",
+                    (version, description, datetime.utcnow().isoformat()),
+                )
+
+    def schema_version(self) -> int:
+        row = self._conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+        return row[0] or 0
+
+    # ---------- Writes ----------
+    @staticmethod
+    def _new_order_key() -> Tuple[str, str]:
+        import secrets
+        from datetime import datetime
+
+        return secrets.token_hex(6), datetime.utcnow().isoformat()
+
+    @staticmethod
+    def _order_rows(order_id: str, ts: str, order: Order) -> List[tuple]:
+        items, payment_method = order
+        return [
+            (order_id, it["item"], it["quantity"], it["price_per_item"], it["total_price"], payment_method, ts,
+             it.get("category"))
+            for it in items
+        ]
+
+    @staticmethod
+    def _rollup_deltas(keyed: Sequence[Tuple[str, str, Order]]) -> Tuple[List[tuple], List[tuple], List[tuple]]:
+        """Fold a batch of orders into upsert rows for the item, order and hourly rollups."""
+        per_item: Dict[Tuple[str, str, str], List[Any]] = {}
+        per_order: Dict[Tuple[str, str], List[Any]] = {}
+        per_hour: Dict[Tuple[str, int], List[Any]] = {}
+        for _, ts, (items, payment_method) in keyed:
+            day = ts[:10]
+            o = per_order.setdefault((day, payment_method), [0, 0, 0.0])
+            h = per_hour.setdefault((day, int(ts[11:13])), [0, 0, 0.0])
+            o[0] += 1
+            h[0] += 1
+            seen = set()
+            for it in items:
+                d = per_item.setdefault((day, it["item"], payment_method), [0, 0.0, 0])
+                d[0] += it["quantity"]
+                d[1] += it["total_price"]
+                if it["item"] not in seen:
+                    seen.add(it["item"])
+                    d[2] += 1
+                o[1] += it["quantity"]
+                o[2] += it["total_price"]
+                h[1] += it["quantity"]
+                h[2] += it["total_price"]
+        return ([k + tuple(v) for k, v in per_item.items()], [k + tuple(v) for k, v in per_order.items()],
+                [k + tuple(v) for k, v in per_hour.items()])
+
+    def _deduct_stock(self, items: List[Dict[str, Any]]):
+        for it in items:
+            cur = self._conn.execute(
+                "UPDATE inventory SET quantity = quantity - ? WHERE item = ? AND quantity >= ?",
+                (it["quantity"], it["item"], it["quantity"]),
+            )
+            if cur.rowcount != 1:
+                raise InsufficientStock(it["item"])
+
+    def _write_orders(self, keyed: Sequence[Tuple[str, str, Order, bool]], isolate: bool = False) -> List[Optional[Exception]]:
+        """
+        Write orders in one transaction. Orders flagged deduct_stock also decrement the
+        inventory table in that transaction. With isolate=False an InsufficientStock aborts the
+        whole batch; with isolate=True each order's deduction runs in a savepoint and only that
+        order is dropped. Returns one entry per order: None if written, else its exception.
+        """
+        results: List[Optional[Exception]] = []
+        written = []
+        with self._lock, self._conn:
+            if any(k[3] for k in keyed):
+                self._conn.execute("BEGIN IMMEDIATE")
+            for order_id, ts, order, deduct_stock in keyed:
+                if deduct_stock:
+                    if isolate:
+                        self._conn.execute("SAVEPOINT order_stock")
+                    try:
+                        self._deduct_stock(order[0])
+                    except InsufficientStock as e:
+                        if not isolate:
+                            raise
+                        self._conn.execute("ROLLBACK TO order_stock")
+                        self._conn.execute("RELEASE order_stock")
+                        results.append(e)
+                        continue
+                    if isolate:
+                        self._conn.execute("RELEASE order_stock")
+                results.append(None)
+                written.append((order_id, ts, order))
+            rows = []
+            for order_id, ts, order in written:
+                rows.extend(self._order_rows(order_id, ts, order))
+            item_rollup, order_rollup, hour_rollup = self._rollup_deltas(written)
+            self._conn.executemany(INSERT_SALE, rows)
+            self._conn.executemany(UPSERT_ITEM_ROLLUP, item_rollup)
+            self._conn.executemany(UPSERT_ORDER_ROLLUP, order_rollup)
+            self._conn.executemany(UPSERT_HOUR_ROLLUP, hour_rollup)
+        return results
+
+    def add_order(self, items: List[Dict[str, Any]], payment_method: str = "cash", deduct_stock: bool = False) -> str:
+        """
+        Record one order. With deduct_stock=True the inventory table is decremented in the same
+        transaction, and InsufficientStock is raised (nothing written) if any line can't be covered.
+        """
+        if self.group_commit:
+            return self.submit_order(items, payment_method, deduct_stock).result()
+        return self.add_orders([(items, payment_method)], deduct_stock)[0]
+
+    def add_orders(self, orders: Iterable[Order], deduct_stock: bool = False) -> List[str]:
+        """Insert many orders with one executemany in a single transaction. Returns their order ids."""
+        keyed = []
+        for order in orders:
+            order_id, ts = self._new_order_key()
+            keyed.append((order_id, ts, order, deduct_stock))
+        self._write_orders(keyed)
+        return [k[0] for k in keyed]
+
+    def submit_order(self, items: List[Dict[str, Any]], payment_method: str = "cash", deduct_stock: bool = False) -> Future:
+        """Queue an order for the next group commit. The future resolves to the order id once it is durable."""
+        if not self.group_commit:
+            raise RuntimeError("submit_order requires SalesDB(group_commit=True)")
+        fut: Future = Future()
+        order_id, ts = self._new_order_key()
+        with self._pending_cv:
+            if self._closing:
+                raise RuntimeError("SalesDB is closed")
+            self._pending.append((order_id, ts, (items, payment_method), deduct_stock, fut))
+            self._pending_cv.notify()
+        return fut
+
+    def _group_commit_loop(self):
+        import time
+
+        while True:
+            with self._pending_cv:
+                while not self._pending and not self._closing:
+                    self._pending_cv.wait()
+                if not self._pending and self._closing:
+                    return
+                # give other tills a short window to join this batch
+                deadline = time.monotonic() + self.group_window
+                while len(self._pending) < self.group_max and not self._closing:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._pending_cv.wait(remaining)
+                batch = self._pending[: self.group_max]
+                del self._pending[: self.group_max]
+            try:
+                # one till running out of stock must not fail the others' checkouts
+                results = self._write_orders([entry[:4] for entry in batch], isolate=True)
+            except Exception as e:
+                for *_, fut in batch:
+                    fut.set_exception(e)
+            else:
+                for entry, error in zip(batch, results):
+                    fut = entry[4]
+                    if error is None:
+                        fut.set_result(entry[0])
+                    else:
+                        fut.set_exception(error)
+
+    # ---------- Inventory ----------
+    def load_inventory(self, items: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        The inventory table in menu.json shape: item -> {quantity, price, description[, category]}.
+        With items, only those rows (missing items are left out).
+        """
+        if items is None:
+            sql, args = "SELECT * FROM inventory ORDER BY item", []
+        else:
+            args = list(items)
+            if not args:
+                return {}
+            sql = f"SELECT * FROM inventory WHERE item IN ({','.join('?' * len(args))}) ORDER BY item"
+        with self._rlock:
+            rows = self._rconn.execute(sql, args).fetchall()
+        inventory = {}
+        for r in rows:
+            entry = {"quantity": r["quantity"], "price": r["price"], "description": r["description"] or ""}
+            if r["category"] is not None:
+                entry["category"] = r["category"]
+            inventory[r["item"]] = entry
+        return inventory
+
+    def save_inventory_items(self, items: Dict[str, Dict[str, Any]], stock: bool = True):
+        """
+        Upsert only the given items into the inventory table. With stock=False existing rows
+        keep their quantity (only new items take theirs), so saving a price or description
+        from a stale in-memory copy can't undo another till's deductions.
+        """
+        rows = [
+            (item, int(d.get("quantity", 0)), float(d.get("price", 0)), d.get("description"), d.get("category"))
+            for item, d in items.items()
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO inventory (item, quantity, price, description, category) VALUES (?,?,?,?,?) "
+                "ON CONFLICT(item) DO UPDATE SET "
+                + ("quantity=excluded.quantity, " if stock else "")
+                + "price=excluded.price, description=excluded.description, category=excluded.category",
+                rows,
+            )
+
+    def restock_item(self, item: str, added: int, record: Dict[str, Any]) -> int:
+        """Add `added` to item's stock (inserting it from record if new); returns the new quantity."""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "INSERT INTO inventory (item, quantity, price, description, category) VALUES (?,?,?,?,?) "
+                "ON CONFLICT(item) DO UPDATE SET quantity=quantity+excluded.quantity, price=excluded.price, "
+                "description=excluded.description, category=excluded.category RETURNING quantity",
+                (item, int(added), float(record.get("price", 0)), record.get("description"), record.get("category")),
+            ).fetchone()
+        return row[0]
+
+    def stock_levels(self, items: Iterable[str]) -> Dict[str, int]:
+        """Current quantity of each given item in the inventory table (missing items are left out)."""
+        items = list(items)
+        if not items:
+            return {}
+        with self._rlock:
+            rows = self._rconn.execute(
+                f"SELECT item, quantity FROM inventory WHERE item IN ({','.join('?' * len(items))})", items
+            ).fetchall()
+        return {r["item"]: r["quantity"] for r in rows}
+
+    def rebuild_rollups(self):
+        """Recompute the rollups from sales history (e.g. after editing sales rows by hand)."""
+        with self._lock, self._conn:
+            _rebuild_rollups(self._conn)
+            _rebuild_hourly_rollup(self._conn)
+
+    def close(self):
+        """Flush any queued group-commit orders and close the connection."""
+        with self._pending_cv:
+            self._closing = True
+            self._pending_cv.notify_all()
+        if self._flusher is not None:
+            self._flusher.join()
+        with self._lock:
+            self._conn.close()
+        with self._rlock:
+            self._rconn.close()
+
+    # ---------- Reads ----------
+    def all_sales(self) -> List[Dict[str, Any]]:
+        with self._rlock:
+            cur = self._rconn.cursor()
+            cur.execute("SELECT * FROM sales ORDER BY id DESC")
+            rows = cur.fetchall()
+        return [dict(r) for r in rows]
+
+    def iter_sales(self, start_iso: Optional[str] = None, end_iso: Optional[str] = None,
+                   columns: Optional[Sequence[str]] = None, chunk_size: int = 1000) -> Iterator[List[sqlite3.Row]]:
+        """
+        Yield sales rows (oldest first) in chunks of chunk_size, filtered by timestamp range and
+        restricted to the given columns. Uses its own connection, so a long export neither holds
+        the shared read lock nor keeps more than one chunk in memory.
+        """
+        sql, params = self._export_query("SELECT " + ", ".join(self._export_columns(columns)), start_iso, end_iso)
+        conn = self._connect()
+        try:
+            cur = conn.execute(sql + " ORDER BY id", params)
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _export_columns(columns: Optional[Sequence[str]]) -> List[str]:
+        if not columns:
+            return list(SALES_COLUMNS)
+        unknown = [c for c in columns if c not in SALES_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown sales columns: {', '.join(unknown)}")
+        return list(columns)
+
+    @staticmethod
+    def _export_query(select: str, start_iso: Optional[str], end_iso: Optional[str]) -> Tuple[str, List[str]]:
+        where, params = [], []
+        if start_iso is not None:
+            where.append("timestamp >= ?")
+            params.append(start_iso)
+        if end_iso is not None:
+            where.append("timestamp <= ?")
+            params.append(end_iso)
+        sql = select + " FROM sales"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return sql, params
+
+    def count_sales(self, start_iso: Optional[str] = None, end_iso: Optional[str] = None) -> int:
+        sql, params = self._export_query("SELECT COUNT(*)", start_iso, end_iso)
+        with self._rlock:
+            return self._rconn.execute(sql, params).fetchone()[0]
+
+    def export_csv(self, path: str, start_iso: Optional[str] = None, end_iso: Optional[str] = None,
+                   columns: Optional[Sequence[str]] = None, compress: Optional[bool] = None,
+                   progress: Optional[Callable[[int, int], None]] = None, chunk_size: int = 1000) -> str:
+        """
+        Stream sales to CSV in constant memory. compress=None gzips when path ends in .gz.
+        progress(rows_written, rows_total) is called after every chunk.
+        """
+        import csv
+        import gzip
+
+        if compress is None:
+            compress = path.lower().endswith(".gz")
+        cols = self._export_columns(columns)
+        total = self.count_sales(start_iso, end_iso) if progress else 0
+        opener = gzip.open if compress else open
+        done = 0
+        with opener(path, "wt", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            for rows in self.iter_sales(start_iso, end_iso, cols, chunk_size):
+                if done == 0:
+                    writer.writerow(cols)  # no rows -> empty file, as before
+                writer.writerows(rows)
+                done += len(rows)
+                if progress:
+                    progress(done, total)
+        return path
+
+    def export_parquet(self, path: str, start_iso: Optional[str] = None, end_iso: Optional[str] = None,
+                       columns: Optional[Sequence[str]] = None,
+                       progress: Optional[Callable[[int, int], None]] = None, chunk_size: int = 50000) -> str:
+        """Stream sales to a Parquet file, one row group per chunk. Requires pyarrow."""
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow).")
+        types = {
+            "id": pyarrow.int64(), "quantity": pyarrow.int64(),
+            "price_per_item": pyarrow.float64(), "total_price": pyarrow.float64(),
+        }
+        cols = self._export_columns(columns)
+        schema = pyarrow.schema([(c, types.get(c, pyarrow.string())) for c in cols])
+        total = self.count_sales(start_iso, end_iso) if progress else 0
+        done = 0
+        with pyarrow.parquet.ParquetWriter(path, schema, compression="snappy") as writer:
+            for rows in self.iter_sales(start_iso, end_iso, cols, chunk_size):
+                arrays = [pyarrow.array([r[i] for r in rows], type=schema.field(i).type) for i in range(len(cols))]
+                writer.write_table(pyarrow.Table.from_arrays(arrays, schema=schema))
+                done += len(rows)
+                if progress:
+                    progress(done, total)
+        return path
+
+    def sales_page(self, limit: int = 200, after: Optional[Tuple[Any, int]] = None,
+                   before: Optional[Tuple[Any, int]] = None, order_by: str = "id",
+                   descending: bool = True, search: str = "") -> List[Dict[str, Any]]:
+        """
+        One page of sales via keyset pagination on (order_by, id) -- newest first by default.
+        after/before are the (order_by value, id) keys of the last/first row already shown:
+        after returns the rows that follow it, before the rows just preceding it (both in
+        display order). search filters on item, order id and payment method (substring).
+        Every page is a single query whatever the offset; order_by columns in SORTABLE_COLUMNS
+        with an index (id, timestamp, order_id, item, total_price) are read in index order.
+        """
+        if order_by not in SORTABLE_COLUMNS:
+            raise ValueError(f"cannot sort sales by {order_by!r}")
+        where, params = [], []
+        if search:
+            pattern = "%" + search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            where.append("(item LIKE ? ESCAPE '\\' OR order_id LIKE ? ESCAPE '\\' OR payment_method LIKE ? ESCAPE '\\')")
+            params += [pattern] * 3
+        # walking backwards (before) flips both the comparison and the scan direction
+        forward = descending if before is None else not descending
+        cmp, direction = ("<", "DESC") if forward else (">", "ASC")
+        cursor = after if before is None else before
+        if cursor is not None:
+            if order_by == "id":
+                where.append(f"id {cmp} ?")
+                params.append(cursor[-1])
+            else:
+                where.append(f"({order_by}, id) {cmp} (?, ?)")
+                params += list(cursor)
+        sql = "SELECT * FROM sales"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        order = f"id {direction}" if order_by == "id" else f"{order_by} {direction}, id {direction}"
+        sql += f" ORDER BY {order} LIMIT ?"
+        params.append(limit)
+        with self._rlock:
+            rows = [dict(r) for r in self._rconn.execute(sql, params).fetchall()]
+        if before is not None:
+            rows.reverse()
+        return rows
+
+    def order_lines(self, order_id: str) -> List[Dict[str, Any]]:
+        with self._rlock:
+            cur = self._rconn.cursor()
+            cur.execute("SELECT * FROM sales WHERE order_id = ? ORDER BY id", (order_id,))
+            rows = cur.fetchall()
+        return [dict(r) for r in rows]
+
+    def sales_between(self, start_iso: str, end_iso: str) -> List[Dict[str, Any]]:
+        with self._rlock:
+            cur = self._rconn.cursor()
+            cur.execute("SELECT * FROM sales WHERE timestamp BETWEEN ? AND ?", (start_iso, end_iso))
+            rows = cur.fetchall()
+        return [dict(r) for r in rows]
+
+    def aggregate(self, start_iso: Optional[str] = None, end_iso: Optional[str] = None,
+                  group_by: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Totals computed in SQL: total_income, total_items and orders_count per group.
+        group_by is None (one overall row) or a key of AGGREGATE_GROUPS; groups come back sorted by key.
+        """
+        where, params = [], []
+        if start_iso is not None:
+            where.append("timestamp >= ?")
+            params.append(start_iso)
+        if end_iso is not None:
+            where.append("timestamp <= ?")
+            params.append(end_iso)
+        key = "NULL"
+        if group_by is not None:
+            if group_by not in AGGREGATE_GROUPS:
+                raise ValueError(f"Cannot group sales by {group_by!r}")
+            key = AGGREGATE_GROUPS[group_by]
+        sql = (
+            f"SELECT {key} AS grp, COALESCE(SUM(total_price), 0) AS total_income, "
+            "COALESCE(SUM(quantity), 0) AS total_items, COUNT(DISTINCT order_id) AS orders_count FROM sales"
+        )
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if group_by is not None:
+            sql += " GROUP BY grp ORDER BY grp"
+        with self._rlock:
+            rows = self._rconn.execute(sql, params).fetchall()
+        return [
+            {
+                "group": r["grp"],
+                "total_income": round(r["total_income"], 2),
+                "total_items": r["total_items"],
+                "orders_count": r["orders_count"],
+            }
+            for r in rows
+        ]
+
+    def rollup(self, first_day: Optional[str] = None, last_day: Optional[str] = None,
+               group_by: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Same result shape as aggregate(), read from the daily rollup tables for whole days
+        first_day..last_day (inclusive, 'YYYY-MM-DD'). group_by is None or a key of ROLLUP_GROUPS.
+        """
+        table = "daily_sales_rollup" if group_by == "item" else "daily_order_rollup"
+        where, params = [], []
+        if first_day is not None:
+            where.append("day >= ?")
+            params.append(first_day)
+        if last_day is not None:
+            where.append("day <= ?")
+            params.append(last_day)
+        key = "NULL"
+        if group_by is not None:
+            if group_by not in ROLLUP_GROUPS:
+                raise ValueError(f"Cannot group rollups by {group_by!r}")
+            key = ROLLUP_GROUPS[group_by]
+        sql = (
+            f"SELECT {key} AS grp, COALESCE(SUM(income), 0) AS total_income, "
+            f"COALESCE(SUM(quantity), 0) AS total_items, COALESCE(SUM(orders), 0) AS orders_count FROM {table}"
+        )
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if group_by is not None:
+            sql += " GROUP BY grp ORDER BY grp"
+        with self._rlock:
+            rows = self._rconn.execute(sql, params).fetchall()
+        return [
+            {
+                "group": r["grp"],
+                "total_income": round(r["total_income"], 2),
+                "total_items": r["total_items"],
+                "orders_count": r["orders_count"],
+            }
+            for r in rows
+        ]
+
+    def chart_series(self, first_day: str, last_day: str, hourly: bool = False,
+                     after_id: Optional[int] = None) -> Tuple[List[Tuple[Any, ...]], int]:
+        """
+        Income for a chart: (day, income, orders) rows per day, or (day, hour, income) rows with
+        hourly=True, for days first_day..last_day -- plus the highest sales id they include.
+
+        after_id=None reads the rollup tables (a few hundred rows whatever the table size).
+        after_id=N returns only the increments from sales rows with id > N, for extending a
+        cached series with what was sold since. Both read in one snapshot, so the returned id
+        matches the rows exactly.
+        """
+        if after_id is None:
+            if hourly:
+                sql = ("SELECT day, hour, income FROM hourly_sales_rollup "
+                       "WHERE day BETWEEN ? AND ? ORDER BY day, hour")
+            else:
+                sql = ("SELECT day, SUM(income), SUM(orders) FROM daily_order_rollup "
+                       "WHERE day BETWEEN ? AND ? GROUP BY day ORDER BY day")
+            params: List[Any] = [first_day, last_day]
+        else:
+            # id > N first: the primary key bounds the scan to the new rows
+            if hourly:
+                sql = ("SELECT substr(timestamp,1,10) AS d, CAST(substr(timestamp,12,2) AS INTEGER), "
+                       "SUM(total_price) FROM sales WHERE id > ? AND substr(timestamp,1,10) BETWEEN ? AND ? "
+                       "GROUP BY 1, 2 ORDER BY 1, 2")
+            else:
+                sql = ("SELECT substr(timestamp,1,10) AS d, SUM(total_price), COUNT(DISTINCT order_id) "
+                       "FROM sales WHERE id > ? AND substr(timestamp,1,10) BETWEEN ? AND ? "
+                       "GROUP BY 1 ORDER BY 1")
+            params = [after_id, first_day, last_day]
+        with self._rlock:
+            self._rconn.execute("BEGIN")
+            try:
+                rows = [tuple(r) for r in self._rconn.execute(sql, params).fetchall()]
+                last_id = self._rconn.execute("SELECT COALESCE(MAX(id), 0) FROM sales").fetchone()[0]
+            finally:
+                self._rconn.execute("COMMIT")
+        return rows, last_id
+
+    def totals(self, start_iso: str, end_iso: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Overall totals from start_iso to end_iso (None = up to now). Whole days come from the
+        rollups; only a partial first/last day is aggregated from raw rows.
+        """
+        from datetime import datetime, timedelta
+
+        start = datetime.fromisoformat(start_iso)
+        first_full = start.date() if start.time() == datetime.min.time() else start.date() + timedelta(days=1)
+        if end_iso is None:
+            last_full = None
+        else:
+            end = datetime.fromisoformat(end_iso)
+            last_full = end.date() - timedelta(days=1)
+        if last_full is not None and first_full > last_full:
+            return self.aggregate(start_iso, end_iso)[0]
+
+        parts = [self.rollup(first_full.isoformat(), last_full.isoformat() if last_full else None)[0]]
+        if first_full != start.date():
+            # 'YYYY-MM-DD' sorts before every timestamp on that day, so this stops at midnight
+            parts.append(self.aggregate(start_iso, first_full.isoformat())[0])
+        if last_full is not None:
+            parts.append(self.aggregate((last_full + timedelta(days=1)).isoformat(), end_iso)[0])
+        return {
+            "group": None,
+            "total_income": round(sum(p["total_income"] for p in parts), 2),
+            "total_items": sum(p["total_items"] for p in parts),
+            "orders_count": sum(p["orders_count"] for p in parts),
+        }
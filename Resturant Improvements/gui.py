@@ -2,16 +2,15 @@ import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog, filedialog
 from typing import Any, Dict, List, Optional
 import os
-import threading
 
 from app import FoodSalesApp
+from inventory import query_inventory
+from tasks import Cancelled, TaskRunner
+from screens import ScreenManager
+from widgets import ProgressDialog, TreeSync, VirtualGrid
 
-# Optional imports
-try:
-    import matplotlib.pyplot as plt
-    MATPLOTLIB_AVAILABLE = True
-except Exception:
-    MATPLOTLIB_AVAILABLE = False
+# Optional imports (charts need matplotlib)
+from charts import MATPLOTLIB_AVAILABLE
 
 # Theme palettes
 DARK = {
@@ -47,10 +46,23 @@ class FoodSalesGUI:
         self.theme = DARK.copy() if self.dark_mode else LIGHT.copy()
 
         self.db = self.app.db
+        self._order_unsubscribe = None  # order panel's subscription to app.order events
+        # DB queries, exports and file rendering run here, off the Tk thread
+        self.tasks = TaskRunner(self.master, on_error=lambda e: messagebox.showerror("Error", str(e)))
         self._style = ttk.Style()
         self._style.configure("Treeview.Heading", font=('Arial', 12, 'bold'))
 
+        # Status bar stays put; screens are built once and swapped in the body below it
+        self.status_var = tk.StringVar(value="Ready")
+        self.body = tk.Frame(self.master, bg=self.theme["bg_main"])
+        self.body.pack(fill="both", expand=True)
+        self._make_status_bar()
+        self.screens = ScreenManager(self.body, max_heavy=3, bg=self.theme["bg_main"])
+        self._register_screens()
+        self._apply_theme()
         self._build_main_menu()
+        # checkouts and stock edits run on the Tk thread, so alerts can touch widgets directly
+        self.app.low_stock.subscribe(self._on_stock_alert)
 
         # Keyboard shortcuts
         self.master.bind_all("<Control-m>", lambda e: self._manager_menu())
@@ -65,10 +77,6 @@ class FoodSalesGUI:
             else:
                 messagebox.showinfo("Note", "You can change the password later from Manager → Change Password.")
 
-        # Status bar
-        self.status_var = tk.StringVar(value="Ready")
-        self._make_status_bar()
-
     # ---------- Theming ----------
     def _apply_theme(self):
         self.master.configure(bg=self.theme["bg_main"])
@@ -78,57 +86,102 @@ class FoodSalesGUI:
         self.theme = DARK.copy() if self.dark_mode else LIGHT.copy()
         # persist pref
         self.app.set_pref("dark_mode", self.dark_mode)
+        # cached screens carry the old colours: rebuild them lazily
+        self._apply_theme()
+        self._status_bar.destroy()
+        self._make_status_bar()
+        self.body.configure(bg=self.theme["bg_main"])
+        self.screens.bg = self.theme["bg_main"]
+        self.screens.invalidate()
         self._build_main_menu()
 
-    # ---------- Helpers ----------
-    def _clear(self):
-        for widget in self.master.winfo_children():
-            widget.destroy()
-        self._apply_theme()
+    # ---------- Screens ----------
+    def _register_screens(self):
+        self.screens.register("main", self._main_screen)
+        self.screens.register("manager", self._manager_screen)
+        self.screens.register("customer", self._customer_screen)
+        self.screens.register("inventory", self._inventory_screen, heavy=True)
+        self.screens.register("sales", self._sales_screen, heavy=True)
+        self.screens.register("ordering", self._ordering_screen, heavy=True)
+        self.screens.register("chart", self._chart_screen, heavy=True)
 
+    # ---------- Helpers ----------
     def _set_status(self, text: str):
         self.status_var.set(text)
 
+    def _on_stock_alert(self, alert):
+        if alert.kind == "out":
+            self._set_status(f"{alert.item.capitalize()} is out of stock")
+        elif alert.kind == "low":
+            self._set_status(f"Low stock: {alert.item.capitalize()} ({alert.quantity} left)")
+
+    def _await(self, future, on_done, poll_ms: int = 30):
+        """Call on_done(result) on the Tk thread once a worker future finishes, without blocking the loop."""
+        if not future.done():
+            self.master.after(poll_ms, lambda: self._await(future, on_done, poll_ms))
+            return
+        try:
+            result = future.result()
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            return
+        on_done(result)
+
     def _make_status_bar(self):
         bar = tk.Frame(self.master, bg=self.theme["bg_frame"], height=24)
-        bar.pack(side="bottom", fill="x")
+        bar.pack(side="bottom", fill="x", before=self.body)
+        self._status_bar = bar
         lbl = tk.Label(bar, textvariable=self.status_var, bg=self.theme["bg_frame"], fg=self.theme["fg"], anchor="w")
         lbl.pack(side="left", padx=6)
 
-    def _searchbox(self, parent, on_change):
+    def _searchbox(self, parent, on_change, delay_ms: int = 200):
+        """on_change(query) runs once typing pauses for delay_ms, not on every keystroke."""
         frame = tk.Frame(parent, bg=self.theme["bg_frame"])
         tk.Label(frame, text="Search:", bg=self.theme["bg_frame"], fg=self.theme["fg"]).pack(side="left", padx=5)
         var = tk.StringVar()
         ent = tk.Entry(frame, textvariable=var, width=30)
         ent.pack(side="left", padx=5)
+        pending = {"job": None, "last": ""}
+        def fire():
+            pending["job"] = None
+            q = var.get().strip().lower()
+            if q != pending["last"]:
+                pending["last"] = q
+                on_change(q)
         def cb(*_):
-            on_change(var.get().strip().lower())
+            if pending["job"] is not None:
+                frame.after_cancel(pending["job"])
+            pending["job"] = frame.after(delay_ms, fire)
         var.trace_add("write", cb)
         return frame
 
-    def _sortable_tree(self, parent, columns, stretch=True):
+    def _sortable_tree(self, parent, columns, on_sort, stretch=True):
         tv = ttk.Treeview(parent, columns=columns, show='headings')
         for col in columns:
-            tv.heading(col, text=col, command=lambda c=col: self._sort_tree(tv, c, False))
             tv.column(col, stretch=stretch)
+        self._bind_sort(tv, columns, on_sort)
         return tv
 
-    def _sort_tree(self, tree, col, reverse):
-        data = [(tree.set(k, col), k) for k in tree.get_children("")]
-        def to_num(s):
-            try:
-                return float(str(s).replace("$",""))
-            except:
-                return s
-        data.sort(key=lambda t: to_num(t[0]), reverse=reverse)
-        for idx, (_, k) in enumerate(data):
-            tree.move(k, "", idx)
-        tree.heading(col, command=lambda: self._sort_tree(tree, col, not reverse))
+    def _bind_sort(self, tree, columns, on_sort, sortable=None):
+        """Heading clicks call on_sort(col, descending); the data source sorts and the grid is redrawn from it."""
+        state = {"col": None, "desc": False}
+        def click(col):
+            desc = not state["desc"] if state["col"] == col else False
+            state.update(col=col, desc=desc)
+            for c in columns:
+                tree.heading(c, text=c + ((" ▼" if desc else " ▲") if c == col else ""))
+            on_sort(col, desc)
+        for col in columns:
+            tree.heading(col, text=col)
+            if sortable is None or col in sortable:
+                tree.heading(col, command=lambda c=col: click(c))
 
     # ---------- Main menu ----------
     def _build_main_menu(self):
-        self._clear()
-        frame = tk.Frame(self.master, bg=self.theme["bg_frame"], bd=6, relief="ridge")
+        self.screens.show("main")
+
+    def _main_screen(self, parent):
+        frame = tk.Frame(parent, bg=self.theme["bg_frame"], bd=6, relief="ridge")
         frame.pack(pady=40, padx=40, fill="both", expand=True)
 
         tk.Label(frame, text="Food Sales Management System — Pro", font=("Arial", 24, "bold"), bg=self.theme["bg_frame"], fg=self.theme["fg"]).pack(pady=20)
@@ -146,25 +199,40 @@ class FoodSalesGUI:
         mkbtn("Exit (Ctrl+Q)", self.master.quit, bg=self.theme["danger"]).grid(row=1, column=1, padx=10, pady=10)
 
         # quick alerts (low stock)
-        lows = self.app.low_stock_items()
-        if lows:
+        low_label = tk.Label(frame, text="", bg=self.theme["bg_frame"], fg=self.theme["danger"])
+        low_label.pack(pady=8)
+
+        def refresh():
+            lows = self.app.low_stock_items()
             txt = ", ".join([f"{k.capitalize()}({q})" for k, q in lows])
-            tk.Label(frame, text=f"Low stock: {txt}", bg=self.theme["bg_frame"], fg=self.theme["danger"]).pack(pady=8)
+            low_label.config(text=f"Low stock: {txt}" if lows else "")
+            self._set_status("Ready")
+        return refresh
 
     # ---------- Manager flow ----------
-    def _manager_login(self) -> bool:
+    def _manager_login(self, on_result):
         pw = simpledialog.askstring("Manager Login", "Enter Manager Password:", show="*")
-        return (pw is not None) and self.app.validate_password(pw)
+        if pw is None:
+            on_result(False)
+            return
+        # bcrypt takes a few hundred ms; check it off the Tk thread so the window keeps painting
+        self._set_status("Checking password…")
+        self._await(self.app.validate_password_async(pw), on_result)
 
     def _manager_menu(self):
-        if not self._manager_login():
-            messagebox.showerror("Denied", "Incorrect password.")
-            return
-        self._manager_menu_gui()
+        def done(ok):
+            if not ok:
+                self._set_status("Ready")
+                messagebox.showerror("Denied", "Incorrect password.")
+                return
+            self._manager_menu_gui()
+        self._manager_login(done)
 
     def _manager_menu_gui(self):
-        self._clear()
-        frame = tk.Frame(self.master, bg=self.theme["bg_frame"], bd=6, relief="groove")
+        self.screens.show("manager")
+
+    def _manager_screen(self, parent):
+        frame = tk.Frame(parent, bg=self.theme["bg_frame"], bd=6, relief="groove")
         frame.pack(pady=30, padx=30, fill="both", expand=True)
         tk.Label(frame, text="Manager Dashboard", font=("Arial", 20, "bold"), bg=self.theme["bg_frame"], fg=self.theme["fg"]).pack(pady=10)
 
@@ -177,46 +245,60 @@ class FoodSalesGUI:
         mk("View Inventory", self._view_inventory)
         mk("Add/Update Item", self._add_update_item)
         mk("Adjust Item Price", self._adjust_price)
+        mk("Low-Stock Levels", self._adjust_low_stock)
         mk("Review Sales (DB)", self._view_sales)
         mk("Export Sales to CSV", self._export_sales)
         mk("Sales Summary (Chart)", self._show_sales_chart)
         mk("Change Password", self._change_password)
         mk("Back to Main Menu", self._build_main_menu)
 
-        self._set_status("Manager mode")
+        return lambda: self._set_status("Manager mode")
 
     def _view_inventory(self):
-        self._clear()
-        frame = tk.Frame(self.master, bg=self.theme["bg_frame"])
+        self.screens.show("inventory")
+
+    def _inventory_screen(self, parent):
+        frame = tk.Frame(parent, bg=self.theme["bg_frame"])
         frame.pack(fill="both", expand=True, padx=20, pady=20)
         tk.Label(frame, text="Current Inventory", font=("Arial", 18, "bold"), bg=self.theme["bg_frame"], fg=self.theme["fg"]).pack(pady=10)
 
-        # search box
-        def apply_filter(q):
-            for i in tv.get_children():
-                tv.delete(i)
-            for item, d in sorted(self.app.inventory.items()):
-                if q and q not in item.lower() and q not in d.get("category","").lower():
-                    continue
+        fields = {"Item": "item", "Quantity": "quantity", "Price": "price", "Category": "category", "Description": "description"}
+        view = {"order_by": "item", "descending": False, "search": ""}
+
+        def redraw():
+            rows = []
+            for item, d in query_inventory(self.app.inventory, index=self.app.search_index, **view):
                 qty = int(d.get("quantity",0))
                 price = float(d.get("price",0))
                 desc = d.get("description","")
                 cat = d.get("category","Uncategorized")
-                node = tv.insert("", "end", values=(item.capitalize(), qty, f"${price:.2f}", cat, desc))
-                if qty < 5:
-                    tv.item(node, tags=("low",))
-            tv.tag_configure("low", background="#ffcccc")
+                rows.append((item, (item.capitalize(), qty, f"${price:.2f}", cat, desc), ("low",) if self.app.low_stock.is_low(item) else ()))
+            sync.apply(rows)
+
+        def apply_filter(q):
+            view["search"] = q
+            redraw()
 
+        def sort(col, descending):
+            view.update(order_by=fields[col], descending=descending)
+            redraw()
+
+        # search box
         sb = self._searchbox(frame, apply_filter)
         sb.pack(pady=5)
 
-        cols = ("Item","Quantity","Price","Category","Description")
-        tv = self._sortable_tree(frame, cols)
+        cols = tuple(fields)
+        tv = self._sortable_tree(frame, cols, sort)
         tv.pack(fill="both", expand=True)
-        apply_filter("")
+        tv.tag_configure("low", background="#ffcccc")
+        sync = TreeSync(tv)
 
         tk.Button(frame, text="Back", command=self._manager_menu_gui, bg=self.theme["accent"], fg="white").pack(pady=10)
-        self._set_status("Viewing inventory")
+
+        def refresh():
+            redraw()
+            self._set_status("Viewing inventory")
+        return refresh
 
     def _add_update_item(self):
         win = tk.Toplevel(self.master); win.title("Add/Update Item"); win.configure(bg=self.theme["bg_frame"])
@@ -261,52 +343,128 @@ class FoodSalesGUI:
             messagebox.showinfo("Result", res, parent=win); win.destroy()
         tk.Button(win, text="Submit", command=submit, bg=self.theme["success"], fg="white").grid(row=2, column=0, columnspan=2, pady=10)
 
+    def _adjust_low_stock(self):
+        items = list(self.app.inventory.keys())
+        if not items:
+            messagebox.showinfo("No Items", "Inventory is empty."); return
+        win = tk.Toplevel(self.master); win.title("Low-Stock Level"); win.configure(bg=self.theme["bg_frame"])
+        tk.Label(win, text="Item:", bg=self.theme["bg_frame"], fg=self.theme["fg"]).grid(row=0, column=0, padx=6, pady=6)
+        item_var = tk.StringVar(value=items[0].capitalize())
+        level_var = tk.StringVar()
+        def show_level(_=None):
+            level_var.set(str(self.app.low_stock.threshold(item_var.get().lower())))
+        box = ttk.Combobox(win, textvariable=item_var, values=[i.capitalize() for i in items], state="readonly")
+        box.grid(row=0, column=1, padx=6, pady=6)
+        box.bind("<<ComboboxSelected>>", show_level)
+        tk.Label(win, text="Alert at or below (blank = default):", bg=self.theme["bg_frame"], fg=self.theme["fg"]).grid(row=1, column=0, padx=6, pady=6)
+        tk.Entry(win, textvariable=level_var).grid(row=1, column=1, padx=6, pady=6)
+        show_level()
+        def submit():
+            raw = level_var.get().strip()
+            try:
+                level = int(raw) if raw else None
+            except ValueError:
+                messagebox.showerror("Invalid", "Enter a whole number.", parent=win); return
+            res = self.app.set_low_stock_threshold(item_var.get(), level)
+            messagebox.showinfo("Result", res, parent=win); win.destroy()
+        tk.Button(win, text="Submit", command=submit, bg=self.theme["success"], fg="white").grid(row=2, column=0, columnspan=2, pady=10)
+
     def _view_sales(self):
-        self._clear()
-        frame = tk.Frame(self.master, bg=self.theme["bg_frame"])
+        self.screens.show("sales")
+
+    def _sales_screen(self, parent):
+        frame = tk.Frame(parent, bg=self.theme["bg_frame"])
         frame.pack(fill="both", expand=True, padx=20, pady=20)
         tk.Label(frame, text="Sales (from DB)", font=("Arial", 18, "bold"), bg=self.theme["bg_frame"], fg=self.theme["fg"]).pack(pady=10)
 
         cols = ("Order ID","Item","Qty","Price/Item","Total","Payment","Timestamp")
-        tv = self._sortable_tree(frame, cols)
-        tv.pack(fill="both", expand=True)
 
-        try:
-            rows = self.db.all_sales()
-        except Exception as e:
-            rows = []
-            messagebox.showerror("DB Error", f"Could not fetch sales: {e}")
-
-        for r in rows:
-            tv.insert("", "end", values=(
+        def fmt(r):
+            return (
                 r.get("order_id"),
-                r.get("item","").capitalize(),
+                (r.get("item") or "").capitalize(),
                 r.get("quantity"),
                 f"${float(r.get('price_per_item') or 0):.2f}",
                 f"${float(r.get('total_price') or 0):.2f}",
                 (r.get("payment_method") or "").capitalize(),
                 (r.get("timestamp") or "").replace("T"," ").split(".")[0]
-            ))
+            )
+
+        # Only a window of rows lives in the Treeview; pages are fetched by (sort column, id)
+        # as you scroll, and sorting/searching re-queries the database instead of the widget.
+        fields = {"Order ID": "order_id", "Item": "item", "Qty": "quantity", "Price/Item": "price_per_item",
+                  "Total": "total_price", "Payment": "payment_method", "Timestamp": "timestamp"}
+        sortable = {c for c, f in fields.items() if f in getattr(self.db, "sortable_columns", ())}
+        grid = VirtualGrid(frame, cols, self.db.sales_page, format_row=fmt,
+                           key=lambda r: (r[grid.params.get("order_by", "id")], r["id"]),
+                           iid=lambda r: str(r["id"]), runner=self.tasks,
+                           on_error=lambda e: messagebox.showerror("DB Error", f"Could not fetch sales: {e}"))
+        grid.params.update(order_by="id", descending=True, search="")
+
+        def run(**params):
+            grid.query(**params)
+
+        sb = self._searchbox(frame, lambda q: run(search=q))
+        sb.pack(pady=5)
+        self._bind_sort(grid.tree, cols, lambda col, desc: run(order_by=fields[col], descending=desc), sortable)
+        grid.pack(fill="both", expand=True)
 
         tk.Button(frame, text="Back", command=self._manager_menu_gui, bg=self.theme["accent"], fg="white").pack(pady=10)
-        self._set_status("Viewing sales")
+
+        def refresh():
+            run()  # same sort/search, first page again (new sales show up at the top)
+            self._set_status("Viewing sales")
+        return refresh
 
     def _export_sales(self):
-        path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV","*.csv")], title="Export Sales CSV")
+        from datastore import PYARROW_AVAILABLE
+        filetypes = [("CSV","*.csv"),("Gzipped CSV","*.csv.gz")]
+        if PYARROW_AVAILABLE:
+            filetypes.append(("Parquet","*.parquet"))
+        path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=filetypes, title="Export Sales")
         if not path:
             return
-        try:
-            out = self.db.export_csv(path)
+        def export(task):
+            try:
+                if path.lower().endswith(".parquet"):
+                    return self.db.export_parquet(path, progress=task.progress)
+                return self.db.export_csv(path, progress=task.progress)
+            except Cancelled:
+                # stopped at a progress report: drop the partial file (a finished one is kept)
+                if os.path.exists(path):
+                    os.remove(path)
+                raise
+
+        def progress(done, total):
+            dialog.update(done, total, f"Exporting sales… {done}/{total} rows")
+            self._set_status(f"Exporting sales… {done}/{total} rows")
+
+        def done(out):
+            dialog.close()
+            self._set_status("Export complete")
             messagebox.showinfo("Exported", f"Saved to:\n{out}")
-        except Exception as e:
+
+        def failed(e):
+            dialog.close()
             messagebox.showerror("Export failed", str(e))
 
+        def cancel():
+            task.cancel()
+            self._set_status("Export cancelled")
+
+        task = self.tasks.submit(export, on_done=done, on_error=failed, on_progress=progress, name="export")
+        dialog = ProgressDialog(self.master, "Export Sales", "Exporting sales…", on_cancel=cancel,
+                                bg=self.theme["bg_frame"], fg=self.theme["fg"])
+
     def _change_password(self):
         new = simpledialog.askstring("Change Password", "Enter new manager password:", show="*")
         if not new or len(new) < 8:
             messagebox.showerror("Invalid", "Password must be at least 8 characters."); return
-        self.app.change_password(new)
-        messagebox.showinfo("Done", "Password changed successfully.")
+        self._set_status("Saving password…")
+        def done(_):
+            self._set_status("Manager mode")
+            messagebox.showinfo("Done", "Password changed successfully.")
+        self._await(self.app.change_password_async(new), done)
 
     def _set_initial_password(self, temp_pass: str):
         # Ask user to provide new password; if they cancel, keep temp (already consumed)
@@ -314,25 +472,31 @@ class FoodSalesGUI:
         if not new or len(new) < 8:
             messagebox.showwarning("Kept temp", "Keeping temporary password. Change it later from Manager → Change Password.")
             return
-        self.app.change_password(new)
-        messagebox.showinfo("Done", "Password set.")
+        self._await(self.app.change_password_async(new), lambda _: messagebox.showinfo("Done", "Password set."))
 
     # ---------- Customer flow ----------
     def _customer_menu(self):
-        self._clear()
-        self.app.clear_order()
-        frame = tk.Frame(self.master, bg=self.theme["bg_frame"], bd=6, relief="ridge")
+        self.screens.show("customer")
+
+    def _customer_screen(self, parent):
+        frame = tk.Frame(parent, bg=self.theme["bg_frame"], bd=6, relief="ridge")
         frame.pack(pady=30, padx=30, fill="both", expand=True)
 
         tk.Label(frame, text="Welcome, Customer!", font=("Arial", 20, "bold"), bg=self.theme["bg_frame"], fg=self.theme["fg"]).pack(pady=10)
 
         tk.Button(frame, text="▶ Start New Order", command=self._ordering, font=("Arial", 16, "bold"), bg=self.theme["success"], fg="white", width=24, height=2, bd=0).pack(pady=12)
         tk.Button(frame, text="Back to Main Menu", command=self._build_main_menu, bg=self.theme["danger"], fg="white").pack(pady=6)
-        self._set_status("Customer mode")
+
+        def refresh():
+            self.app.clear_order()
+            self._set_status("Customer mode")
+        return refresh
 
     def _ordering(self):
-        self._clear()
-        main = tk.Frame(self.master, bg=self.theme["bg_main"])
+        self.screens.show("ordering")
+
+    def _ordering_screen(self, parent):
+        main = tk.Frame(parent, bg=self.theme["bg_main"])
         main.pack(fill="both", expand=True, padx=8, pady=8)
         main.columnconfigure(0, weight=2)
         main.columnconfigure(1, weight=3)
@@ -348,16 +512,16 @@ class FoodSalesGUI:
         self.menu_tree.column("Price", width=80, anchor="e")
         self.menu_tree.pack(fill="both", expand=True, padx=6, pady=6)
 
-        def refresh_menu(q=""):
-            for i in self.menu_tree.get_children():
-                self.menu_tree.delete(i)
-            for item, d in sorted(self.app.inventory.items()):
-                if d.get("quantity",0) <= 0:
-                    continue
-                if q and q not in item.lower() and q not in d.get("category","").lower():
-                    continue
-                self.menu_tree.insert("", "end", values=(item.capitalize(), f"${d['price']:.2f}"), tags=(item,))
-        refresh_menu("")
+        menu_sync = TreeSync(self.menu_tree)
+        query = {"q": ""}
+        def refresh_menu(q=None):
+            if q is not None:
+                query["q"] = q
+            inv = self.app.inventory
+            menu_sync.apply([
+                (item, (item.capitalize(), f"${inv[item]['price']:.2f}"), (item,))
+                for item in self.app.search_menu(query["q"])
+            ])
 
         sb = self._searchbox(left, refresh_menu)
         sb.pack(pady=4)
@@ -400,8 +564,13 @@ class FoodSalesGUI:
         tk.Button(right, text="Checkout", command=self._checkout, bg=self.theme["success"], fg="white").grid(row=4, column=0, columnspan=3, pady=8, sticky="ew")
         tk.Button(right, text="Back", command=self._customer_menu, bg=self.theme["accent"], fg="white").grid(row=5, column=0, columnspan=3, pady=6, sticky="ew")
 
-        self._refresh_order()
-        self._set_status("Creating order")
+        def refresh():
+            if self.app.store.transactional:
+                self.app.refresh_inventory()  # pick up other tills' new items and price changes
+            refresh_menu()  # stock may have changed since the screen was last shown
+            self._refresh_order()
+            self._set_status("Creating order")
+        return refresh
 
     def _add_from_menu(self):
         sel = self.menu_tree.selection()
@@ -413,7 +582,6 @@ class FoodSalesGUI:
         res = self.app.add_to_order(tag, qty)
         if "Insufficient stock" in res or "not found" in res:
             messagebox.showerror("Error", res); return
-        self._refresh_order()
 
     def _mod_qty(self, delta: int):
         sel = self.order_tree.selection()
@@ -423,7 +591,6 @@ class FoodSalesGUI:
         res = self.app.update_order_quantity(tag, delta)
         if "Insufficient stock" in res:
             messagebox.showerror("Error", res)
-        self._refresh_order()
 
     def _remove_item(self):
         sel = self.order_tree.selection()
@@ -431,26 +598,44 @@ class FoodSalesGUI:
             messagebox.showwarning("Select", "Pick an item to remove."); return
         tag = self.order_tree.item(sel[0])['tags'][0]
         self.app.remove_from_order(tag)
-        self._refresh_order()
 
     def _undo_remove(self):
         res = self.app.undo_last_removal()
         messagebox.showinfo("Undo", res)
-        self._refresh_order()
 
     def _refresh_order(self):
-        for i in self.order_tree.get_children(): self.order_tree.delete(i)
-        total = 0.0
-        for item, qty in self.app.order.items():
-            price = float(self.app.inventory[item]['price'])
-            subtotal = price * qty
-            total += subtotal
-            self.order_tree.insert("", "end", values=(item.capitalize(), qty, f"${subtotal:.2f}"), tags=(item,))
-        self.total_label.config(text=f"Total: ${total:.2f}")
+        """Full redraw of the order panel; after that, _on_order_event patches single rows."""
+        self.order_tree.delete(*self.order_tree.get_children())
+        order = self.app.order
+        for item, qty in order.items():
+            self.order_tree.insert("", "end", iid=item, values=(item.capitalize(), qty, f"${order.subtotal(item):.2f}"), tags=(item,))
+        self.total_label.config(text=f"Total: ${order.total:.2f}")
+        if self._order_unsubscribe:
+            self._order_unsubscribe()
+        self._order_unsubscribe = order.subscribe(self._on_order_event)
+
+    def _on_order_event(self, ev):
+        tree = self.order_tree
+        if not tree.winfo_exists():
+            self._order_unsubscribe()  # ordering screen is gone
+            self._order_unsubscribe = None
+            return
+        if ev.kind == "cleared":
+            tree.delete(*tree.get_children())
+        elif ev.kind == "removed":
+            if tree.exists(ev.item):
+                tree.delete(ev.item)
+        else:
+            values = (ev.item.capitalize(), ev.quantity, f"${ev.subtotal:.2f}")
+            if tree.exists(ev.item):
+                tree.item(ev.item, values=values)
+            else:
+                tree.insert("", "end", iid=ev.item, values=values, tags=(ev.item,))
+        self.total_label.config(text=f"Total: ${ev.total:.2f}")
 
     def _checkout(self):
         # Keep checkout logic minimal UI; heavy-lifting done in app.checkout
-        total = sum(self.app.inventory[it]['price'] * qty for it, qty in self.app.order.items())
+        total = self.app.order.total
         if total <= 0:
             messagebox.showinfo("Empty", "Your order is empty.")
             return
@@ -467,11 +652,11 @@ class FoodSalesGUI:
                 if messagebox.askyesno("Success", "Payment complete. Save receipt to file?"):
                     path = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF","*.pdf"),("Text","*.txt")])
                     if path:
-                        try:
-                            out = self.app.save_receipt_pdf(msg, path)
-                            messagebox.showinfo("Saved", f"Receipt saved to:\n{out}")
-                        except Exception as e:
-                            messagebox.showerror("Save failed", str(e))
+                        self._set_status("Saving receipt…")
+                        self.tasks.submit(lambda t: self.app.save_receipt_pdf(msg, path),
+                                          on_done=lambda out: messagebox.showinfo("Saved", f"Receipt saved to:\n{out}"),
+                                          on_error=lambda e: messagebox.showerror("Save failed", str(e)),
+                                          name="receipt")
                 else:
                     messagebox.showinfo("Receipt", msg)
                 win.destroy()
@@ -486,41 +671,24 @@ class FoodSalesGUI:
         if not MATPLOTLIB_AVAILABLE:
             messagebox.showwarning("Matplotlib required", "Matplotlib not available. Install it to see charts.")
             return
-        # Build summary data (daily last 7 days)
-        try:
-            rows = self.db.all_sales()
-        except Exception as e:
-            messagebox.showerror("DB Error", str(e)); return
-
-        # Aggregate by date
-        agg = {}
-        from datetime import datetime, timedelta
-        today = datetime.utcnow()
-        for i in range(7):
-            d = (today - timedelta(days=i)).date().isoformat()
-            agg[d] = 0.0
-        for r in rows:
-            ts = r.get("timestamp", "")
-            try:
-                d = ts.split("T")[0]
-                if d in agg:
-                    agg[d] += float(r.get("total_price") or 0)
-            except Exception:
-                continue
-        dates = sorted(agg.keys())
-        values = [agg[d] for d in dates]
-
-        # plot in a thread-safe way
-        def _plot():
-            plt.figure(figsize=(8,4))
-            plt.plot(dates, values, marker='o')
-            plt.title("Sales (last 7 days)")
-            plt.xlabel("Date")
-            plt.ylabel("Income")
-            plt.tight_layout()
-            plt.show()
-        threading.Thread(target=_plot, daemon=True).start()
+        self.screens.show("chart")
+
+    def _chart_screen(self, parent):
+        from charts import SalesChart
+        frame = tk.Frame(parent, bg=self.theme["bg_frame"])
+        frame.pack(fill="both", expand=True, padx=20, pady=20)
+        tk.Label(frame, text="Sales Chart", font=("Arial", 18, "bold"), bg=self.theme["bg_frame"], fg=self.theme["fg"]).pack(pady=10)
+        # series come from the rollup tables and are extended with new sales while the screen is open
+        chart = SalesChart(frame, self.db, self.tasks, bg=self.theme["bg_frame"], fg=self.theme["fg"])
+        chart.frame.pack(fill="both", expand=True)
+        tk.Button(frame, text="Back", command=self._manager_menu_gui, bg=self.theme["accent"], fg="white").pack(pady=10)
+
+        def refresh():
+            chart.refresh()  # cached series: only sales since the last visit are queried
+            self._set_status("Viewing sales chart")
+        return refresh
 
     # ---------- Small niceties ----------
     def run(self):
         self.master.mainloop()
+        self.tasks.shutdown()
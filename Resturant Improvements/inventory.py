@@ -0,0 +1,157 @@
+"""
+Inventory persistence backends for FoodSalesApp.
+
+Both backends keep the menu.json shape (item -> {quantity, price, description, category})
+for the in-memory inventory and for import/export; they differ in what a change costs:
+
+- JSONInventoryStore rewrites the whole menu.json on every save (the original behaviour),
+  atomically. With config.json "menu_json": {"flush_delay": 0.5, "compact": true} bursts of
+  saves are coalesced into one background write and the file is written without indentation.
+- SQLiteInventoryStore keeps the inventory in sales.db and upserts only the changed items.
+  Its checkouts deduct stock in the same transaction as the sale rows, and restocks add to
+  the stored quantity rather than overwrite it, so several tills (threads or processes) can
+  share one sales.db as the stock authority. The json backend is for a single till.
+  Each till still works from its in-memory copy: checkout re-reads the cart's items
+  (records()) so the sale is priced from the table. The whole copy, including other tills'
+  new items and edits, is reloaded when the ordering screen is shown
+  (FoodSalesApp.refresh_inventory).
+"""
+import copy
+import json
+import os
+import sys
+import threading
+from typing import Any, Dict, Iterable, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from jsonstore import DebouncedJSONWriter, atomic_write_json
+
+
+class JSONInventoryStore:
+    """Whole-file menu.json persistence."""
+
+    name = "json"
+    transactional = False  # stock deduction and the sale record are separate writes
+
+    def __init__(self, menu_file: str, flush_delay: float = 0.0, compact: bool = False, lock=None):
+        self.menu_file = menu_file
+        # lock: the one the inventory is mutated under (FoodSalesApp._lock). The writer shares it,
+        # so a delayed write copies the inventory while no till can be halfway through a change.
+        self.writer = DebouncedJSONWriter(menu_file, delay=flush_delay, compact=compact, indent=4,
+                                          lock=lock or threading.RLock())
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.menu_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def save(self, inventory: Dict[str, Dict[str, Any]], changed: Iterable[str] = ()):
+        self.writer.schedule(lambda: copy.deepcopy(inventory))
+
+    def restock(self, inventory: Dict[str, Dict[str, Any]], item: str, added: int) -> int:
+        record = inventory[item]
+        record["quantity"] = int(record.get("quantity", 0)) + int(added)
+        self.save(inventory, [item])
+        return record["quantity"]
+
+    def flush(self):
+        self.writer.flush()
+
+    def export_json(self, inventory: Dict[str, Dict[str, Any]], path: str) -> str:
+        atomic_write_json(path, inventory, indent=4)
+        return path
+
+
+class SQLiteInventoryStore:
+    """Inventory rows in the sales database; saves touch only the changed items."""
+
+    name = "sqlite"
+    transactional = True  # SalesDB.add_order(deduct_stock=True) updates stock with the sale
+
+    def __init__(self, db, seed_file: str = None):
+        self.db = db
+        self.seed_file = seed_file
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        inventory = self.db.load_inventory()
+        if not inventory and self.seed_file and os.path.exists(self.seed_file):
+            # first run on this backend: take over the existing menu.json
+            inventory = self.import_json(self.seed_file)
+        return inventory
+
+    def save(self, inventory: Dict[str, Dict[str, Any]], changed: Iterable[str] = ()):
+        items = {k: inventory[k] for k in changed if k in inventory}
+        if items:
+            # stock only moves through restock() and checkout's guarded deduction
+            self.db.save_inventory_items(items, stock=False)
+
+    def restock(self, inventory: Dict[str, Dict[str, Any]], item: str, added: int) -> int:
+        """Add to the stored quantity (other tills' sales included); returns the new quantity."""
+        quantity = self.db.restock_item(item, added, inventory[item])
+        inventory[item]["quantity"] = quantity
+        return quantity
+
+    def stock(self, items: Iterable[str]) -> Dict[str, int]:
+        return self.db.stock_levels(items)
+
+    def records(self, items: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Current stored records of the given items (other tills' edits included)."""
+        return self.db.load_inventory(items)
+
+    def import_json(self, path: str) -> Dict[str, Dict[str, Any]]:
+        with open(path, "r", encoding="utf-8") as f:
+            inventory = json.load(f)
+        self.db.save_inventory_items(inventory)
+        return inventory
+
+    def flush(self):
+        pass  # every save is already committed
+
+    def export_json(self, inventory: Dict[str, Dict[str, Any]], path: str) -> str:
+        atomic_write_json(path, inventory, indent=4)
+        return path
+
+
+INVENTORY_SORT_KEYS = {
+    "item": lambda name, d: name.lower(),
+    "quantity": lambda name, d: int(d.get("quantity", 0)),
+    "price": lambda name, d: float(d.get("price", 0)),
+    "category": lambda name, d: (d.get("category") or "Uncategorized").lower(),
+    "description": lambda name, d: (d.get("description") or "").lower(),
+}
+
+
+def query_inventory(inventory: Dict[str, Dict[str, Any]], order_by: str = "item", descending: bool = False,
+                    search: str = "", index=None) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    (name, record) pairs of the in-memory inventory, filtered and sorted by the typed field
+    values -- what the inventory grid shows, without reading cells back from Tk.
+    With a search.SearchIndex the filter also covers descriptions and is an index lookup;
+    without one it is a substring scan over name and category. Ties are broken by name.
+    """
+    key = INVENTORY_SORT_KEYS[order_by]
+    if index is not None:
+        names = index.ordered(index.search(search)) if search else index.names()
+        rows = [(name, inventory[name]) for name in names if name in inventory]
+    else:
+        q = search.lower()
+        rows = [
+            (name, d) for name, d in inventory.items()
+            if not q or q in name.lower() or q in (d.get("category") or "").lower()
+        ]
+        rows.sort(key=lambda t: t[0].lower())
+    if order_by != "item":
+        rows.sort(key=lambda t: key(*t), reverse=descending)
+    elif descending:
+        rows.reverse()
+    return rows
+
+
+def make_inventory_store(backend: str, menu_file: str, db, flush_delay: float = 0.0, compact: bool = False,
+                         lock=None):
+    """Backend from config.json "inventory_backend": "json" (default) or "sqlite"."""
+    if backend == "sqlite" and hasattr(db, "load_inventory"):
+        return SQLiteInventoryStore(db, seed_file=menu_file)
+    return JSONInventoryStore(menu_file, flush_delay=flush_delay, compact=compact, lock=lock)
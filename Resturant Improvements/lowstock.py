@@ -0,0 +1,114 @@
+"""
+Low-stock tracking without rescanning the inventory.
+
+LowStockIndex knows each item's quantity and threshold (a default, overridable per item)
+and keeps the items at or below their threshold in a list sorted by (quantity, name).
+Stock changes go through update(item, quantity), which only moves that one item in or out
+of the list, so low_items() costs O(k) for k low items instead of a pass over the menu.
+
+Subscribers are told when an item's low-stock state matters:
+
+    index.subscribe(lambda alert: ...)   # alert.kind in "low", "out", "restocked"
+
+"low" fires when an item drops to its threshold or changes quantity while below it, "out"
+when it reaches zero and "restocked" when it climbs back above its threshold.
+"""
+import bisect
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+
+class StockAlert(NamedTuple):
+    kind: str  # "low" | "out" | "restocked"
+    item: str
+    quantity: int
+    threshold: int
+
+
+class LowStockIndex:
+    def __init__(self, inventory: Dict[str, Dict[str, Any]] = None, default: int = 5,
+                 thresholds: Optional[Dict[str, int]] = None):
+        self.default = int(default)
+        self._thresholds: Dict[str, int] = {k: int(v) for k, v in (thresholds or {}).items()}
+        self._qty: Dict[str, int] = {}
+        self._low: List[Tuple[int, str]] = []
+        self._listeners: List[Callable[[StockAlert], None]] = []
+        for name, record in (inventory or {}).items():
+            q = self._qty[name] = int(record.get("quantity", 0))
+            if q <= self.threshold(name):
+                self._low.append((q, name))
+        self._low.sort()
+
+    def threshold(self, item: str) -> int:
+        return self._thresholds.get(item, self.default)
+
+    def is_low(self, item: str) -> bool:
+        return item in self._qty and self._qty[item] <= self.threshold(item)
+
+    def low_items(self) -> List[Tuple[str, int]]:
+        """(item, quantity) for every item at or below its threshold, lowest stock first."""
+        return [(name, q) for q, name in self._low]
+
+    def __len__(self):
+        return len(self._low)
+
+    # ----- maintenance -----
+    def update(self, item: str, quantity: int):
+        """Record item's new quantity (also adds unknown items)."""
+        quantity = int(quantity)
+        old = self._qty.get(item)
+        if old == quantity:
+            return
+        was_low = old is not None and old <= self.threshold(item)
+        if was_low:
+            self._discard(old, item)
+        self._qty[item] = quantity
+        self._place(item, was_low)
+
+    def set_threshold(self, item: str, threshold: Optional[int]):
+        """Override item's threshold; None goes back to the default."""
+        q = self._qty.get(item)
+        was_low = q is not None and q <= self.threshold(item)
+        if was_low:
+            self._discard(q, item)
+        if threshold is None:
+            self._thresholds.pop(item, None)
+        else:
+            self._thresholds[item] = int(threshold)
+        if q is not None:
+            self._place(item, was_low)
+
+    def remove(self, item: str):
+        q = self._qty.pop(item, None)
+        if q is not None and q <= self.threshold(item):
+            self._discard(q, item)
+
+    def refresh(self, inventory: Dict[str, Dict[str, Any]]):
+        """Bring the index in line with inventory after a bulk reload."""
+        for name in [n for n in self._qty if n not in inventory]:
+            self.remove(name)
+        for name, record in inventory.items():
+            self.update(name, record.get("quantity", 0))
+
+    def _discard(self, quantity: int, item: str):
+        i = bisect.bisect_left(self._low, (quantity, item))
+        if i < len(self._low) and self._low[i] == (quantity, item):
+            del self._low[i]
+
+    def _place(self, item: str, was_low: bool):
+        q, limit = self._qty[item], self.threshold(item)
+        if q <= limit:
+            bisect.insort(self._low, (q, item))
+            self._emit("out" if q <= 0 else "low", item, q, limit)
+        elif was_low:
+            self._emit("restocked", item, q, limit)
+
+    # ----- alerts -----
+    def subscribe(self, listener: Callable[[StockAlert], None]) -> Callable[[], None]:
+        """Call listener(alert) on low-stock changes; returns a function that unsubscribes it."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener) if listener in self._listeners else None
+
+    def _emit(self, kind: str, item: str, quantity: int, threshold: int):
+        alert = StockAlert(kind, item, quantity, threshold)
+        for listener in list(self._listeners):
+            listener(alert)
@@ -0,0 +1,93 @@
+"""
+The open order (cart) as an observable mapping.
+
+Order behaves like the plain item -> quantity dict FoodSalesApp used to keep, but tracks each
+line's subtotal and the running total as quantities change, and tells subscribers exactly
+which line changed:
+
+    order.subscribe(lambda ev: ...)   # ev.kind in "added", "updated", "removed", "cleared"
+
+so a view can patch one row and the total label instead of redrawing the whole order.
+Amounts are kept in integer cents, so the running total never drifts from the sum of lines.
+"""
+from typing import Callable, Dict, Iterator, List, MutableMapping, NamedTuple, Optional
+
+
+class OrderEvent(NamedTuple):
+    kind: str  # "added" | "updated" | "removed" | "cleared"
+    item: Optional[str]
+    quantity: int
+    subtotal: float
+    total: float
+
+
+class Order(MutableMapping):
+    def __init__(self, price_of: Callable[[str], float]):
+        self.price_of = price_of
+        self._qty: Dict[str, int] = {}
+        self._cents: Dict[str, int] = {}
+        self._total_cents = 0
+        self._listeners: List[Callable[[OrderEvent], None]] = []
+
+    # ----- mapping protocol -----
+    def __getitem__(self, item: str) -> int:
+        return self._qty[item]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._qty)
+
+    def __len__(self) -> int:
+        return len(self._qty)
+
+    def __setitem__(self, item: str, quantity: int):
+        if quantity <= 0:
+            if item in self._qty:
+                del self[item]
+            return
+        kind = "updated" if item in self._qty else "added"
+        self._qty[item] = int(quantity)
+        self._set_line(item)
+        self._emit(kind, item)
+
+    def __delitem__(self, item: str):
+        del self._qty[item]
+        self._total_cents -= self._cents.pop(item)
+        self._emit("removed", item)
+
+    def clear(self):
+        self._qty.clear()
+        self._cents.clear()
+        self._total_cents = 0
+        self._emit("cleared", None)
+
+    # ----- totals -----
+    def _set_line(self, item: str):
+        cents = round(float(self.price_of(item)) * self._qty[item] * 100)
+        self._total_cents += cents - self._cents.get(item, 0)
+        self._cents[item] = cents
+
+    def reprice(self, item: str):
+        """Recompute a line after its menu price changed."""
+        if item in self._qty:
+            self._set_line(item)
+            self._emit("updated", item)
+
+    def subtotal(self, item: str) -> float:
+        return self._cents.get(item, 0) / 100
+
+    @property
+    def total(self) -> float:
+        return self._total_cents / 100
+
+    # ----- events -----
+    def subscribe(self, listener: Callable[[OrderEvent], None]) -> Callable[[], None]:
+        """Call listener(event) after every change; returns a function that unsubscribes it."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener) if listener in self._listeners else None
+
+    def _emit(self, kind: str, item: Optional[str]):
+        if not self._listeners:
+            return
+        event = OrderEvent(kind, item, self._qty.get(item, 0), self.subtotal(item), self.total)
+        for listener in list(self._listeners):
+            listener(event)
@@ -0,0 +1,75 @@
+"""
+Screen switching for FoodSalesGUI without tearing widgets down.
+
+Each screen is built once, into its own Frame inside a container, the first time it is
+shown; its builder creates the widgets and returns a refresh function that fills them
+with current data. Switching screens hides the current frame (pack_forget), packs the
+cached one and calls refresh -- building is the expensive part (trees, charts), so a
+screen switch is normally a repack plus a data refresh.
+
+Screens registered as heavy (big Treeviews, the chart canvas) are kept in an LRU of
+max_heavy entries; the least recently shown one is destroyed when the bound is exceeded and
+rebuilt if it is needed again. Light screens (menus) stay cached until invalidate().
+
+    screens = ScreenManager(body, max_heavy=3)
+    screens.register("main", build_main)              # build(frame) -> refresh callable or None
+    screens.register("sales", build_sales, heavy=True)
+    screens.show("main")
+"""
+import tkinter as tk
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+Builder = Callable[[tk.Frame], Optional[Callable[[], None]]]
+
+
+class ScreenManager:
+    def __init__(self, container, max_heavy: int = 3, bg: str = None):
+        self.container = container
+        self.max_heavy = max_heavy
+        self.bg = bg
+        self._builders: Dict[str, Tuple[Builder, bool]] = {}
+        self._cached: "OrderedDict[str, Tuple[tk.Frame, Optional[Callable[[], None]]]]" = OrderedDict()
+        self.current: Optional[str] = None
+        self.builds = 0  # how many screens were (re)built -- handy when tuning max_heavy
+
+    def register(self, name: str, build: Builder, heavy: bool = False):
+        self._builders[name] = (build, heavy)
+
+    def show(self, name: str):
+        if name not in self._cached:
+            build, _ = self._builders[name]
+            frame = tk.Frame(self.container, bg=self.bg)
+            refresh = build(frame)
+            self._cached[name] = (frame, refresh)
+            self.builds += 1
+        self._cached.move_to_end(name)
+        if self.current != name:
+            if self.current in self._cached:
+                self._cached[self.current][0].pack_forget()
+            self._cached[name][0].pack(fill="both", expand=True)
+            self.current = name
+        frame, refresh = self._cached[name]
+        if refresh:
+            refresh()
+        self._evict()
+
+    def _evict(self):
+        heavy = [n for n in self._cached if self._builders[n][1]]  # least recently shown first
+        while len(heavy) > self.max_heavy:
+            victim = next(n for n in heavy if n != self.current)
+            heavy.remove(victim)
+            self.drop(victim)
+
+    def drop(self, name: str):
+        """Destroy one cached screen; it is rebuilt on its next show()."""
+        entry = self._cached.pop(name, None)
+        if entry is not None:
+            entry[0].destroy()
+        if self.current == name:
+            self.current = None
+
+    def invalidate(self):
+        """Destroy every cached screen (e.g. after a theme change)."""
+        for name in list(self._cached):
+            self.drop(name)
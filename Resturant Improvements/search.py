@@ -0,0 +1,116 @@
+"""
+In-memory search index over the inventory (item name, category and description).
+
+The search boxes used to rescan every item with substring checks on each keystroke.
+SearchIndex keeps two structures that are updated per item when the inventory changes:
+
+- a trigram index (3-letter chunk -> item names). A query of 3+ characters only looks at
+  items containing all of its trigrams, then confirms the substring match on those;
+- a sorted list of (word, item) pairs. Shorter queries are matched as word prefixes with
+  two bisects, since a 1-2 letter substring matches almost everything anyway.
+
+search() returns the matching names; names() keeps all names in sorted order so callers
+can show matches in menu order without sorting again.
+"""
+import bisect
+from collections import defaultdict
+from typing import Any, DefaultDict, Dict, Iterable, List, Set, Tuple
+
+FIELDS = ("category", "description")
+
+
+def _text(name: str, record: Dict[str, Any]) -> str:
+    return " ".join([name] + [str(record.get(f) or "") for f in FIELDS]).lower()
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SearchIndex:
+    def __init__(self, inventory: Dict[str, Dict[str, Any]] = None):
+        self._text: Dict[str, str] = {}
+        self._grams: DefaultDict[str, Set[str]] = defaultdict(set)
+        self._words: List[Tuple[str, str]] = []
+        self._names: List[str] = []
+        # bulk build: one sort instead of an insort per word
+        grams = self._grams
+        for name, record in (inventory or {}).items():
+            text = self._text[name] = _text(name, record)
+            for g in _trigrams(text):
+                grams[g].add(name)
+            self._words.extend((w, name) for w in set(text.split()))
+        self._words.sort()
+        self._names = sorted(self._text)
+
+    def __len__(self):
+        return len(self._text)
+
+    def update(self, name: str, record: Dict[str, Any]):
+        """(Re)index one item; cheap no-op if its searchable text did not change."""
+        text = _text(name, record)
+        old = self._text.get(name)
+        if old == text:
+            return
+        if old is not None:
+            self._unindex(name, old)
+        else:
+            bisect.insort(self._names, name)
+        self._text[name] = text
+        for g in _trigrams(text):
+            self._grams[g].add(name)
+        for w in set(text.split()):
+            bisect.insort(self._words, (w, name))
+
+    def remove(self, name: str):
+        old = self._text.pop(name, None)
+        if old is None:
+            return
+        self._unindex(name, old)
+        del self._names[bisect.bisect_left(self._names, name)]
+
+    def _unindex(self, name: str, text: str):
+        for g in _trigrams(text):
+            bucket = self._grams.get(g)
+            if bucket is not None:
+                bucket.discard(name)
+                if not bucket:
+                    del self._grams[g]
+        for w in set(text.split()):
+            i = bisect.bisect_left(self._words, (w, name))
+            if i < len(self._words) and self._words[i] == (w, name):
+                del self._words[i]
+
+    def refresh(self, inventory: Dict[str, Dict[str, Any]]):
+        """Bring the index in line with inventory after a bulk reload."""
+        for name in [n for n in self._text if n not in inventory]:
+            self.remove(name)
+        for name, record in inventory.items():
+            self.update(name, record)
+
+    def names(self) -> List[str]:
+        return self._names
+
+    def search(self, query: str) -> Set[str]:
+        """Names whose name/category/description contains query (word prefix if shorter than 3)."""
+        q = query.strip().lower()
+        if not q:
+            return set(self._text)
+        if len(q) < 3:
+            lo = bisect.bisect_left(self._words, (q, ""))
+            hi = bisect.bisect_left(self._words, (q + "\uffff", ""))
+            return {name for _, name in self._words[lo:hi]}
+        grams = sorted(_trigrams(q), key=lambda g: len(self._grams.get(g, ())))
+        candidates = self._grams.get(grams[0], set())
+        for g in grams[1:]:
+            if not candidates:
+                break
+            candidates = candidates & self._grams.get(g, set())
+        return {name for name in candidates if q in self._text[name]}
+
+    def ordered(self, matches: Iterable[str]) -> List[str]:
+        """matches in name order."""
+        matches = matches if isinstance(matches, (set, frozenset, dict)) else set(matches)
+        if len(matches) * 8 < len(self._names):
+            return sorted(matches)
+        return [n for n in self._names if n in matches]
@@ -3,13 +3,24 @@ import secrets
 import string
 
 
-def hash_password(password: str) -> str:
+DEFAULT_ROUNDS = 12  # bcrypt cost factor: each +1 doubles hashing/verification time
+
+
+def hash_password(password: str, rounds: int = None) -> str:
     """Hash password with bcrypt (salt included)."""
     pw = password.encode("utf-8")
-    hashed = bcrypt.hashpw(pw, bcrypt.gensalt())
+    hashed = bcrypt.hashpw(pw, bcrypt.gensalt(rounds or DEFAULT_ROUNDS))
     return hashed.decode("utf-8")
 
 
+def hash_rounds(stored: str) -> int:
+    """Cost factor a stored bcrypt hash was made with ($2b$<rounds>$...), 0 if unknown."""
+    try:
+        return int(stored.split("$")[2])
+    except Exception:
+        return 0
+
+
 def verify_password(password: str, stored: str) -> bool:
     """Verify password against stored bcrypt hash."""
     try:
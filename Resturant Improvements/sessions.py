@@ -0,0 +1,74 @@
+"""
+Per-terminal carts for FoodSalesApp.
+
+Each till (or API client) works in its own Session: an order.Order cart plus its undo slot.
+Carts never write stock. While items sit in a cart they only count as holds, so another
+session in the same process is not offered stock that is already spoken for. Stock is taken
+at checkout by the inventory store's guarded deduction (SalesDB: UPDATE ... WHERE
+quantity >= ?, in the sale's transaction). That statement is the single authority shared
+by every thread and every process on the same sales.db. A till that loses the race gets
+InsufficientStock and keeps its cart, so nothing is deducted twice and no update is lost.
+
+    registry = SessionRegistry(price_of)
+    cart = registry.get("till-3").order
+    registry.held("pizza", exclude="till-3")   # pizzas sitting in other tills' carts
+"""
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from order import Order
+
+DEFAULT_SESSION = "default"
+
+
+class Session:
+    def __init__(self, session_id: str, price_of: Callable[[str], float]):
+        self.id = session_id
+        self.order = Order(price_of)
+        self.last_removed: Optional[Tuple[str, int]] = None  # for undo (item, qty)
+        self.last_active = time.monotonic()
+
+
+class SessionRegistry:
+    def __init__(self, price_of: Callable[[str], float]):
+        self.price_of = price_of
+        self._sessions: Dict[str, Session] = {}
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str = DEFAULT_SESSION) -> Session:
+        """The session's state, opened on first use."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = Session(session_id, self.price_of)
+            session.last_active = time.monotonic()
+            return session
+
+    def close(self, session_id: str) -> bool:
+        """Drop a session and release its holds."""
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def all(self) -> List[Session]:
+        with self._lock:
+            return list(self._sessions.values())
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def held(self, item: str, exclude: Optional[str] = None) -> int:
+        """Quantity of item sitting in carts other than exclude's."""
+        return sum(s.order.get(item, 0) for s in self.all() if s.id != exclude)
+
+    def expire_idle(self, max_idle: float) -> List[str]:
+        """Close sessions untouched for max_idle seconds (abandoned API carts); returns their ids."""
+        cutoff = time.monotonic() - max_idle
+        with self._lock:
+            stale = [sid for sid, s in self._sessions.items() if s.last_active < cutoff and sid != DEFAULT_SESSION]
+            for sid in stale:
+                del self._sessions[sid]
+        return stale
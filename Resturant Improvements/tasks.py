@@ -0,0 +1,131 @@
+"""
+Background jobs for the Tk GUI.
+
+Tk must only be touched from the thread running mainloop(), so slow work (sales queries,
+exports, receipt rendering, chart data) runs on a TaskRunner's thread pool and reports
+back through a queue that the Tk thread drains every poll_ms with master.after:
+
+    task = runner.submit(lambda t: db.export_csv(path, progress=t.progress),
+                         on_done=..., on_error=..., on_progress=lambda done, total: ...)
+    task.cancel()
+
+The job function receives its Task. task.progress(...) may be called as often as the job
+likes; only the latest value is handed to on_progress, once per poll. Cancellation is
+cooperative: a queued task never starts, and a running one stops at its next
+task.progress()/task.check(), which raise Cancelled. A cancelled task's on_done/on_error
+are never called, so stale results (e.g. an earlier search) can't overwrite newer ones.
+"""
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+
+class Cancelled(Exception):
+    pass
+
+
+class Task:
+    def __init__(self, runner: "TaskRunner", name: str = ""):
+        self.name = name
+        self.future: Optional[Future] = None
+        self._runner = runner
+        self._cancel = threading.Event()
+        self._progress = None
+        self._progress_posted = False
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+        if self.future is not None and self.future.cancel():
+            self._runner._post(self, "cancelled", None)  # never started: just drop its callbacks
+
+    def check(self):
+        """Raise Cancelled if cancel() was called; call it between steps of a long job."""
+        if self._cancel.is_set():
+            raise Cancelled(self.name)
+
+    def progress(self, *value):
+        """Report progress from the worker (coalesced); also a cancellation point."""
+        self.check()
+        with self._lock:
+            self._progress = value
+            if self._progress_posted:
+                return
+            self._progress_posted = True
+        self._runner._post(self, "progress", None)
+
+    def _take_progress(self):
+        with self._lock:
+            self._progress_posted = False
+            return self._progress
+
+
+class TaskRunner:
+    def __init__(self, master, workers: int = 4, poll_ms: int = 30,
+                 on_error: Callable[[BaseException], None] = None):
+        self.master = master
+        self.poll_ms = poll_ms
+        self.on_error = on_error  # for tasks submitted without their own on_error
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gui-task")
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._callbacks = {}
+        self._closed = False
+        self.master.after(self.poll_ms, self._drain)
+
+    def submit(self, fn: Callable[..., Any], *args, on_done: Callable[[Any], None] = None,
+               on_error: Callable[[BaseException], None] = None,
+               on_progress: Callable[..., None] = None, name: str = "") -> Task:
+        """Run fn(task, *args) on the pool; callbacks run on the Tk thread."""
+        task = Task(self, name or getattr(fn, "__name__", "task"))
+        self._callbacks[task] = (on_done, on_error, on_progress)
+        task.future = self._pool.submit(self._run, task, fn, args)
+        return task
+
+    def _run(self, task: Task, fn, args):
+        try:
+            task.check()
+            result = fn(task, *args)
+        except Cancelled:
+            self._post(task, "cancelled", None)
+        except BaseException as e:
+            self._post(task, "error", e)
+        else:
+            self._post(task, "done", result)
+
+    def _post(self, task: Task, kind: str, payload):
+        self._queue.put((task, kind, payload))
+
+    def _drain(self):
+        # reschedule first so a raising callback can't stop the loop
+        if not self._closed:
+            self.master.after(self.poll_ms, self._drain)
+        while True:
+            try:
+                task, kind, payload = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            on_done, on_error, on_progress = self._callbacks.get(task, (None, None, None))
+            if kind == "progress":
+                value = task._take_progress()
+                if on_progress and not task.cancelled:
+                    on_progress(*value)
+                continue
+            self._callbacks.pop(task, None)
+            if task.cancelled or kind == "cancelled":
+                continue
+            if kind == "done":
+                if on_done:
+                    on_done(payload)
+            elif on_error or self.on_error:
+                (on_error or self.on_error)(payload)
+
+    def shutdown(self):
+        self._closed = True
+        for task in list(self._callbacks):
+            task.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
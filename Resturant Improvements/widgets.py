@@ -0,0 +1,292 @@
+"""
+Reusable Tk widgets for FoodSalesGUI.
+
+VirtualGrid shows a table that may be far larger than what Tk can hold (the sales table):
+the Treeview only ever contains a sliding window of at most max_rows rows. Pages are
+fetched with keyset pagination -- "the page_size rows after/before this key" -- so each
+fetch is one indexed query no matter how deep the user has scrolled, and rows scrolled
+far out of view are dropped from the widget again.
+
+The paging bookkeeping lives in PagedWindow, which has no Tk dependency.
+
+TreeSync redraws a small, fully loaded Treeview (menu, inventory) from a new row list
+by touching only the rows that changed.
+"""
+import tkinter as tk
+from collections import deque
+from tkinter import ttk
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+Row = Dict[str, Any]
+# fetch(limit, after=key) -> rows following key; fetch(limit, before=key) -> rows preceding it.
+# Both return rows in display order; fetch(limit) returns the first page.
+Fetch = Callable[..., List[Row]]
+
+
+class PagedWindow:
+    """The (iid, key) pairs currently loaded, plus whether either end of the data is reached."""
+
+    def __init__(self, fetch: Fetch, key: Callable[[Row], Any], iid: Callable[[Row], str],
+                 page_size: int = 200, max_rows: int = 1000):
+        self.fetch = fetch
+        self.key = key
+        self.iid = iid
+        self.page_size = page_size
+        self.max_rows = max(max_rows, 2 * page_size)
+        self.loaded: Deque[Tuple[str, Any]] = deque()
+        self.at_top = True
+        self.at_end = True
+
+    def _remember(self, rows: Sequence[Row]) -> List[Tuple[str, Any]]:
+        return [(self.iid(r), self.key(r)) for r in rows]
+
+    def request(self, direction: str) -> Optional[Dict[str, Any]]:
+        """fetch() keyword arguments for the next page in direction ("first", "below", "above"),
+        or None if there is nothing more that way."""
+        if direction == "first":
+            return {}
+        if not self.loaded:
+            return None
+        if direction == "below":
+            return None if self.at_end else {"after": self.loaded[-1][1]}
+        return None if self.at_top else {"before": self.loaded[0][1]}
+
+    def accept(self, direction: str, rows: Sequence[Row]) -> List[str]:
+        """Take in a fetched page; returns the iids that fell out of the window."""
+        dropped = []
+        if direction == "first":
+            self.loaded = deque(self._remember(rows))
+            self.at_top = True
+            self.at_end = len(rows) < self.page_size
+        elif direction == "below":
+            self.at_end = len(rows) < self.page_size
+            self.loaded.extend(self._remember(rows))
+            while len(self.loaded) > self.max_rows:
+                dropped.append(self.loaded.popleft()[0])
+                self.at_top = False
+        else:
+            self.at_top = len(rows) < self.page_size
+            self.loaded.extendleft(reversed(self._remember(rows)))
+            while len(self.loaded) > self.max_rows:
+                dropped.append(self.loaded.pop()[0])
+                self.at_end = False
+        return dropped
+
+    def _load(self, direction: str) -> Tuple[List[Row], List[str]]:
+        req = self.request(direction)
+        if req is None:
+            return [], []
+        rows = self.fetch(self.page_size, **req)
+        return rows, self.accept(direction, rows)
+
+    def reset(self) -> List[Row]:
+        return self._load("first")[0]
+
+    def more_below(self) -> Tuple[List[Row], List[str]]:
+        """Next page; returns (rows to append, iids to drop from the top)."""
+        return self._load("below")
+
+    def more_above(self) -> Tuple[List[Row], List[str]]:
+        """Previous page; returns (rows to prepend, iids to drop from the bottom)."""
+        return self._load("above")
+
+
+class VirtualGrid:
+    """
+    Treeview + scrollbar over a PagedWindow. When the view comes within `threshold`
+    (a fraction of the loaded rows) of either end, the next page is loaded on idle.
+    With a tasks.TaskRunner the fetches run on its worker threads and the rows are
+    inserted when they arrive; a new query() drops any page still in flight.
+
+        grid = VirtualGrid(frame, cols, db.sales_page, format_row=fmt, iid=lambda r: str(r["id"]),
+                           key=lambda r: (r[grid.params.get("order_by", "id")], r["id"]), runner=tasks)
+        grid.pack(fill="both", expand=True)
+        grid.query(order_by="total_price", descending=True)   # params are passed on to fetch
+    """
+
+    def __init__(self, parent, columns: Sequence[str], fetch: Fetch, key: Callable[[Row], Any],
+                 format_row: Callable[[Row], Sequence[Any]], iid: Callable[[Row], str] = None,
+                 page_size: int = 200, max_rows: int = 1000, threshold: float = 0.1,
+                 runner=None, on_error: Callable[[BaseException], None] = None):
+        self.frame = tk.Frame(parent)
+        self.tree = ttk.Treeview(self.frame, columns=columns, show="headings")
+        self.vsb = ttk.Scrollbar(self.frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self._on_yscroll)
+        self.vsb.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+        for col in columns:
+            self.tree.heading(col, text=col)
+        self.format_row = format_row
+        self.threshold = threshold
+        self.runner = runner
+        self.on_error = on_error
+        self.params: Dict[str, Any] = {}  # extra fetch arguments, e.g. order_by / search
+        self._fetch = fetch
+        self.window = PagedWindow(lambda limit, **kw: fetch(limit, **kw, **self.params),
+                                  key, iid or (lambda r: str(key(r))), page_size, max_rows)
+        self._check_pending = None
+        self._task = None  # page fetch in flight (runner mode)
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def query(self, **params):
+        """Change the fetch arguments (sort order, filter) and start again from the first page."""
+        self.params.update(params)
+        self.reload()
+
+    def reload(self):
+        """Drop everything and show the first page."""
+        self._load("first")
+
+    def _load(self, direction: str):
+        if direction == "first" and self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._task is not None:
+            return  # one page at a time; _check_edges runs again after it lands
+        req = self.window.request(direction)
+        if req is None:
+            return
+        if self.runner is None:
+            try:
+                rows = self.window.fetch(self.window.page_size, **req)
+            except Exception as e:
+                if self.on_error is None:
+                    raise
+                self.on_error(e)
+                return
+            self._show(direction, rows)
+            return
+        params, limit = dict(self.params), self.window.page_size
+
+        def done(rows):
+            self._task = None
+            self._show(direction, rows)
+
+        def failed(e):
+            self._task = None
+            if self.on_error:
+                self.on_error(e)
+
+        self._task = self.runner.submit(lambda t: self._fetch(limit, **req, **params),
+                                        on_done=done, on_error=failed, name="page")
+
+    def _show(self, direction: str, rows: List[Row]):
+        if not self.tree.winfo_exists():
+            return
+        if direction == "first":
+            self.window.accept("first", rows)
+            self.tree.delete(*self.tree.get_children(""))
+            for row in rows:
+                self.tree.insert("", "end", iid=self.window.iid(row), values=self.format_row(row))
+            self.tree.yview_moveto(0)
+            return
+        children = self.tree.get_children("")
+        if not rows or not children:
+            self.window.accept(direction, rows)
+            return
+        # keep the row currently at the top of the view in place while rows come and go
+        anchor = children[min(len(children) - 1, int(self.tree.yview()[0] * len(children)))]
+        dropped = self.window.accept(direction, rows)
+        if dropped:
+            self.tree.delete(*dropped)
+        if direction == "above":
+            for row in reversed(rows):
+                self.tree.insert("", 0, iid=self.window.iid(row), values=self.format_row(row))
+        else:
+            for row in rows:
+                self.tree.insert("", "end", iid=self.window.iid(row), values=self.format_row(row))
+        if self.tree.exists(anchor):
+            self.tree.yview_moveto(self.tree.index(anchor) / max(1, len(self.tree.get_children(""))))
+
+    def _on_yscroll(self, first, last):
+        self.vsb.set(first, last)
+        if self._check_pending is None:
+            self._check_pending = self.tree.after_idle(self._check_edges)
+
+    def _check_edges(self):
+        self._check_pending = None
+        if not self.tree.winfo_exists():
+            return
+        first, last = self.tree.yview()
+        if last >= 1.0 - self.threshold and not self.window.at_end:
+            self._load("below")
+        elif first <= self.threshold and not self.window.at_top:
+            self._load("above")
+
+
+class TreeSync:
+    """
+    Applies a new row list to a flat Treeview as a diff: rows that left are deleted in one
+    call, new rows inserted, rows whose values changed updated, and the order fixed with a
+    single set_children -- instead of deleting and re-inserting everything.
+
+        sync = TreeSync(tree)
+        sync.apply([(iid, values, tags), ...])
+    """
+
+    def __init__(self, tree: ttk.Treeview):
+        self.tree = tree
+        self.shown: Dict[str, Tuple[Tuple[Any, ...], Tuple[str, ...]]] = {}
+
+    def apply(self, rows: Sequence[Tuple[str, Sequence[Any], Sequence[str]]]):
+        wanted = {}
+        for iid, values, tags in rows:
+            wanted[iid] = (tuple(values), tuple(tags))
+        gone = [iid for iid in self.shown if iid not in wanted]
+        if gone:
+            self.tree.delete(*gone)
+        for iid, (values, tags) in wanted.items():
+            old = self.shown.get(iid)
+            if old is None:
+                self.tree.insert("", "end", iid=iid, values=values, tags=tags)
+            elif old != (values, tags):
+                self.tree.item(iid, values=values, tags=tags)
+        order = tuple(wanted)
+        if self.tree.get_children("") != order:
+            self.tree.set_children("", *order)
+        self.shown = wanted
+
+    def clear(self):
+        self.tree.delete(*self.shown)
+        self.shown = {}
+
+
+class ProgressDialog:
+    """Non-modal progress window with a Cancel button for a background task."""
+
+    def __init__(self, master, title: str, text: str = "Working…", on_cancel: Callable[[], None] = None,
+                 bg: str = None, fg: str = None):
+        self.win = tk.Toplevel(master, bg=bg)
+        self.win.title(title)
+        self.win.resizable(False, False)
+        self.win.transient(master)
+        self.on_cancel = on_cancel
+        self.label = tk.Label(self.win, text=text, anchor="w", width=44, bg=bg, fg=fg)
+        self.label.pack(padx=12, pady=(12, 6), fill="x")
+        self.bar = ttk.Progressbar(self.win, length=320, mode="indeterminate")
+        self.bar.pack(padx=12, pady=6)
+        self.bar.start(15)
+        tk.Button(self.win, text="Cancel", command=self.cancel).pack(pady=(6, 12))
+        self.win.protocol("WM_DELETE_WINDOW", self.cancel)
+
+    def update(self, done: int, total: int, text: str = None):
+        if not self.win.winfo_exists():
+            return
+        if total:
+            if str(self.bar["mode"]) != "determinate":
+                self.bar.stop()
+                self.bar.configure(mode="determinate", maximum=total)
+            self.bar["value"] = done
+        if text is not None:
+            self.label.config(text=text)
+
+    def cancel(self):
+        if self.on_cancel:
+            self.on_cancel()
+        self.close()
+
+    def close(self):
+        if self.win.winfo_exists():
+            self.win.destroy()
@@ -0,0 +1,203 @@
+"""
+Crash-safe JSON persistence shared by the side projects.
+
+    from jsonstore import atomic_write_json, DebouncedJSONWriter
+
+atomic_write_json writes to a temp file in the target's directory, fsyncs it and
+os.replace()s it over the target, so a crash mid-write leaves either the old
+file or the new one -- never a truncated one.
+
+DebouncedJSONWriter coalesces bursts of saves: schedule() may be called on every
+mutation, and the file is written once, `delay` seconds after the last call.
+Pending data is flushed on flush(), close() and interpreter exit.
+
+CachedJSONFile keeps a small JSON document (e.g. config.json) in memory: reads
+never open the file, and it is reloaded only when its mtime/size change.
+Edits are written through immediately or batched through a DebouncedJSONWriter.
+
+The projects live in plain folders, so scripts import this module by putting
+the repository root on sys.path first.
+"""
+import atexit
+import copy
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional, Tuple, Union
+
+
+def dumps(data: Any, compact: bool = False, indent: int = 4) -> str:
+    if compact:
+        return json.dumps(data, separators=(",", ":"))
+    return json.dumps(data, indent=indent)
+
+
+def atomic_write_text(path: str, text: str, encoding: str = "utf-8"):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", suffix=os.path.basename(path), dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding=encoding) as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_json(path: str, data: Any, compact: bool = False, indent: int = 4):
+    """Serialize data and atomically replace path with it."""
+    atomic_write_text(path, dumps(data, compact=compact, indent=indent))
+
+
+class DebouncedJSONWriter:
+    """
+    Coalescing background writer for one JSON file.
+
+    schedule(data) remembers the latest data and (re)starts a `delay`-second timer;
+    when it fires the data is serialized and written with atomic_write_json.
+    Data is serialized at write time, so pass a callable returning a snapshot if
+    other threads may mutate it in the meantime; give the writer the lock those threads
+    mutate under (an RLock) and the snapshot is taken while it is held. delay=0 writes
+    synchronously.
+    """
+
+    def __init__(self, path: str, delay: float = 0.5, compact: bool = False, indent: int = 4,
+                 on_write: Optional[Callable[[], None]] = None, lock=None):
+        self.path = path
+        self.delay = delay
+        self.compact = compact
+        self.indent = indent
+        self.on_write = on_write  # called after each completed write
+        self.writes = 0
+        self._lock = lock or threading.Lock()
+        self._pending: Optional[Union[Any, Callable[[], Any]]] = None
+        self._dirty = False
+        self._timer: Optional[threading.Timer] = None
+        atexit.register(self.flush)
+
+    def schedule(self, data: Union[Any, Callable[[], Any]]):
+        with self._lock:
+            self._pending = data
+            self._dirty = True
+            if self.delay <= 0:
+                self._write_locked()
+                return
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Write pending data now (no-op if nothing is pending)."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._write_locked()
+
+    def _write_locked(self):
+        if not self._dirty:
+            return
+        data = self._pending() if callable(self._pending) else self._pending
+        atomic_write_json(self.path, data, compact=self.compact, indent=self.indent)
+        self._dirty = False
+        self._pending = None
+        self.writes += 1
+        if self.on_write:
+            self.on_write()
+
+    def close(self):
+        self.flush()
+        atexit.unregister(self.flush)
+
+
+class CachedJSONFile:
+    """
+    In-memory copy of a JSON object file.
+
+    data() returns the cached dict (treat it as read-only); the file is stat()ed at most
+    every check_interval seconds and re-read only if its mtime or size changed.
+    Mutate through edit():
+
+        with cfg.edit() as data:              # written through before the block returns
+            data["password"] = ...
+        with cfg.edit(batch=True) as data:    # coalesced, written flush_delay seconds later
+            data["prefs"]["dark_mode"] = True
+    """
+
+    def __init__(self, path: str, default: Optional[dict] = None, flush_delay: float = 1.0,
+                 check_interval: float = 1.0, indent: int = 4):
+        self.path = path
+        self.default = default if default is not None else {}
+        self.check_interval = check_interval
+        self.reloads = 0
+        self._lock = threading.RLock()
+        self._data: dict = {}
+        self._stat: Optional[Tuple[int, int]] = None
+        self._checked = 0.0
+        self._writer = DebouncedJSONWriter(path, delay=flush_delay, indent=indent,
+                                           on_write=self._remember_stat)
+        self._load()
+
+    def _file_stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _remember_stat(self):
+        with self._lock:
+            self._stat = self._file_stat()
+
+    def _load(self):
+        stat = self._file_stat()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            data = copy.deepcopy(self.default)
+        self._data = data if isinstance(data, dict) else copy.deepcopy(self.default)
+        self._stat = stat
+        self._checked = time.monotonic()
+        self.reloads += 1
+
+    def _refresh(self):
+        now = time.monotonic()
+        if now - self._checked < self.check_interval:
+            return
+        self._checked = now
+        # don't let an outside edit discard our own unflushed changes
+        if not self._writer._dirty and self._file_stat() != self._stat:
+            self._load()
+
+    def data(self) -> dict:
+        with self._lock:
+            self._refresh()
+            return self._data
+
+    def _snapshot(self) -> dict:
+        with self._lock:
+            return copy.deepcopy(self._data)
+
+    @contextmanager
+    def edit(self, batch: bool = False) -> Iterator[dict]:
+        with self._lock:
+            self._refresh()
+            yield self._data
+        # outside our lock: the writer takes its own lock, then ours (via _snapshot/on_write)
+        self._writer.schedule(self._snapshot)
+        if not batch:
+            self._writer.flush()
+
+    def flush(self):
+        self._writer.flush()
@@ -0,0 +1,203 @@
+"""
+End-to-end benchmark for the POS apps' FoodSalesApp, driven headlessly (no Tk).
+
+    python pos_bench.py [--apps "Resturant Improvements" "Food Sells"] [--items 100 1000 10000 100000]
+                        [--orders 200] [--max-lines 5] [--backend json] [--out results.json]
+
+For every app folder and menu size, a worker subprocess gets a throwaway copy of the
+folder (code only, plus jsonstore.py) in a temp directory, with a synthetic menu of that
+many items. Both apps import their modules by bare name (app, datastore, ...), hence one
+process per folder; the copy keeps the real menu.json, config.json and sales.db untouched.
+
+The worker then times each call of:
+
+- add_to_order: orders of 1..max-lines lines, items drawn with a Zipf-like skew so a few
+  items are popular, as on a real menu;
+- checkout: one per order, cycling payment methods;
+- sales_summary: daily/weekly/monthly over the sales just made (apps that have it);
+- export_csv: SalesDB.export_csv of the whole sales table.
+
+Results are printed (or written to --out) as JSON with count/mean/p50/p95/p99/max in
+milliseconds per operation, so runs from two versions can be diffed. --backend picks the
+Resturant Improvements inventory backend ("json" rewrites menu.json per checkout,
+"sqlite" deducts stock in the sale's transaction).
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+APPS = ("Resturant Improvements", "Food Sells")
+CATEGORIES = ("Mains", "Sides", "Drinks", "Desserts", "Breakfast", "Salads", "Soups", "Kids", "Specials", "Sauces")
+
+
+def percentiles(samples: List[float]) -> Dict[str, Any]:
+    """count/mean/p50/p95/p99/max of samples (seconds), in ms; nearest-rank percentiles."""
+    if not samples:
+        return {"count": 0}
+    xs = sorted(samples)
+
+    def rank(p):
+        return xs[min(len(xs) - 1, max(0, int(round(p / 100 * len(xs))) - 1))] * 1000
+
+    return {
+        "count": len(xs),
+        "mean": round(sum(xs) / len(xs) * 1000, 3),
+        "p50": round(rank(50), 3),
+        "p95": round(rank(95), 3),
+        "p99": round(rank(99), 3),
+        "max": round(xs[-1] * 1000, 3),
+    }
+
+
+def synthetic_menu(n: int, rng: random.Random) -> Dict[str, Dict[str, Any]]:
+    return {
+        f"item{i:06d}": {
+            "quantity": 10 ** 9,  # never the bottleneck: we measure the write path, not sell-outs
+            "price": round(rng.uniform(1, 50), 2),
+            "description": f"Synthetic menu item {i}.",
+            "category": CATEGORIES[i % len(CATEGORIES)],
+        }
+        for i in range(n)
+    }
+
+
+def zipf_weights(n: int, skew: float) -> List[float]:
+    return [1 / (rank ** skew) for rank in range(1, n + 1)]
+
+
+# ---------- worker (runs inside the throwaway copy) ----------
+def run_worker(args) -> Dict[str, Any]:
+    workdir = os.getcwd()
+    sys.path.insert(0, workdir)
+    from app import FoodSalesApp
+
+    rng = random.Random(args.seed)
+    menu = synthetic_menu(args.worker_items, rng)
+    with open(os.path.join(workdir, "menu.json"), "w", encoding="utf-8") as f:
+        json.dump(menu, f)
+    if os.path.exists(os.path.join(workdir, "inventory.py")):  # Resturant Improvements
+        with open(os.path.join(workdir, "config.json"), "w", encoding="utf-8") as f:
+            json.dump({"inventory_backend": args.backend, "bcrypt_rounds": 4}, f)
+
+    started = time.perf_counter()
+    app = FoodSalesApp(menu_file=os.path.join(workdir, "menu.json"), config_file=os.path.join(workdir, "config.json"))
+    startup = time.perf_counter() - started
+
+    names = sorted(menu)
+    rng.shuffle(names)  # popularity independent of name order
+    weights = zipf_weights(len(names), args.skew)
+    timings: Dict[str, List[float]] = {"add_to_order": [], "checkout": [], "sales_summary": [], "export_csv": []}
+    failures = 0
+    payments = ("cash", "card", "online")
+    for i in range(args.orders):
+        app.clear_order()
+        for item in rng.choices(names, weights, k=rng.randint(1, args.max_lines)):
+            t = time.perf_counter()
+            app.add_to_order(item, rng.randint(1, 3))
+            timings["add_to_order"].append(time.perf_counter() - t)
+        t = time.perf_counter()
+        ok, _ = app.checkout(payments[i % len(payments)])
+        timings["checkout"].append(time.perf_counter() - t)
+        failures += not ok
+
+    if hasattr(app, "sales_summary"):
+        for i in range(args.reports):
+            t = time.perf_counter()
+            app.sales_summary(("daily", "weekly", "monthly")[i % 3])
+            timings["sales_summary"].append(time.perf_counter() - t)
+    csv_path = os.path.join(workdir, "export.csv")
+    for _ in range(args.exports):
+        t = time.perf_counter()
+        app.db.export_csv(csv_path)
+        timings["export_csv"].append(time.perf_counter() - t)
+
+    result = {
+        "startup_ms": round(startup * 1000, 3),
+        "failed_checkouts": failures,
+        "ops": {name: percentiles(samples) for name, samples in timings.items() if samples},
+    }
+    if not timings["sales_summary"]:
+        result["ops"]["sales_summary"] = None  # this app has no sales_summary
+    return result
+
+
+# ---------- driver ----------
+def bench_app(folder: str, items: int, args) -> Dict[str, Any]:
+    src = os.path.join(ROOT, folder)
+    with tempfile.TemporaryDirectory(prefix="pos-bench-") as tmp:
+        workdir = os.path.join(tmp, "app")
+        shutil.copytree(src, workdir, ignore=shutil.ignore_patterns(
+            "*.db", "*.db-*", "menu.json", "config.json", "__pycache__", "audit_archive"))
+        shutil.copy(os.path.join(ROOT, "jsonstore.py"), tmp)
+        cmd = [sys.executable, os.path.abspath(__file__), "--worker-items", str(items),
+               "--orders", str(args.orders), "--max-lines", str(args.max_lines), "--skew", str(args.skew),
+               "--reports", str(args.reports), "--exports", str(args.exports),
+               "--backend", args.backend, "--seed", str(args.seed)]
+        proc = subprocess.run(cmd, cwd=workdir, capture_output=True, text=True, timeout=args.timeout)
+    entry = {"app": folder, "items": items}
+    if folder == "Resturant Improvements":
+        entry["backend"] = args.backend
+    if proc.returncode != 0:
+        entry["error"] = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"
+        return entry
+    entry.update(json.loads(proc.stdout.strip().splitlines()[-1]))
+    return entry
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apps", nargs="+", default=list(APPS), help="app folders to benchmark")
+    parser.add_argument("--items", type=int, nargs="+", default=[100, 1000, 10000, 100000], help="menu sizes")
+    parser.add_argument("--orders", type=int, default=200)
+    parser.add_argument("--max-lines", type=int, default=5, help="lines per order are 1..max-lines")
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent of item popularity")
+    parser.add_argument("--reports", type=int, default=30, help="sales_summary calls")
+    parser.add_argument("--exports", type=int, default=5, help="export_csv calls")
+    parser.add_argument("--backend", choices=["json", "sqlite"], default="json",
+                        help="Resturant Improvements inventory backend")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=1800, help="seconds per app/menu-size run")
+    parser.add_argument("--out", help="write the JSON here instead of stdout")
+    parser.add_argument("--worker-items", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker_items is not None:
+        print(json.dumps(run_worker(args)))
+        return
+
+    results = []
+    for folder in args.apps:
+        for items in args.items:
+            print(f"{folder}: {items} items...", file=sys.stderr, flush=True)
+            results.append(bench_app(folder, items, args))
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("out", "worker_items")},
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()